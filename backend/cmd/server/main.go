@@ -1,14 +1,21 @@
 package main
 
 import (
+	"context"
+	"errors"
 	"log"
+	"net/http"
 	"net/url"
 	"os"
 	"os/exec"
+	"os/signal"
+	"syscall"
+	"time"
 
 	docs "github.com/Quantum3-Labs/stacks-builder/backend/docs"
 	"github.com/Quantum3-Labs/stacks-builder/backend/internal/api"
 	"github.com/Quantum3-Labs/stacks-builder/backend/internal/api/middleware"
+	"github.com/Quantum3-Labs/stacks-builder/backend/internal/auth"
 	"github.com/Quantum3-Labs/stacks-builder/backend/internal/database"
 	"github.com/Quantum3-Labs/stacks-builder/backend/internal/querylog"
 	"github.com/gin-gonic/gin"
@@ -32,12 +39,16 @@ import (
 
 // isDataDirEmpty checks if the /data directory is empty or doesn't exist
 func isDataDirEmpty(dataDir string) bool {
-	entries, err := os.ReadDir(dataDir)
+	dir, err := os.Open(dataDir)
 	if err != nil {
 		// Directory doesn't exist or can't be read
 		return true
 	}
-	return len(entries) == 0
+	defer dir.Close()
+
+	// Reading a single name is enough to know the directory is not empty.
+	names, err := dir.Readdirnames(1)
+	return err != nil || len(names) == 0
 }
 
 func resolveDataDirectories() (string, string) {
@@ -73,11 +84,27 @@ func runPythonScript(scriptPath string, args ...string) error {
 	return cmd.Run()
 }
 
-// initializeDataIfNeeded checks if data directory is empty and runs initialization scripts
-func initializeDataIfNeeded() error {
-	// Get directories from environment variables
-	dataDir, chromaDBDir := resolveDataDirectories()
+// runPythonScriptsConcurrently runs independent scripts in parallel and waits for all of them.
+// It returns the first error encountered, if any.
+func runPythonScriptsConcurrently(scriptPaths ...string) error {
+	errs := make(chan error, len(scriptPaths))
+	for _, scriptPath := range scriptPaths {
+		go func(path string) {
+			errs <- runPythonScript(path)
+		}(scriptPath)
+	}
 
+	var firstErr error
+	for range scriptPaths {
+		if err := <-errs; err != nil && firstErr == nil {
+			firstErr = err
+		}
+	}
+	return firstErr
+}
+
+// initializeDataIfNeeded runs the initialization scripts when the data directories were found empty
+func initializeDataIfNeeded(dataDir, chromaDBDir string, needsInitialization bool) error {
 	cloneReposScript := os.Getenv("PYTHON_CLONE_SCRIPT")
 	if cloneReposScript == "" {
 		cloneReposScript = "scripts/clone_repos.py" // fallback
@@ -101,24 +128,18 @@ func initializeDataIfNeeded() error {
 	log.Printf("Using data directory: %s", dataDir)
 	log.Printf("Using ChromaDB directory: %s", chromaDBDir)
 
-	// Check if data directory is empty
-	if isDataDirEmpty(dataDir) || isDataDirEmpty(chromaDBDir) {
+	if needsInitialization {
 		log.Println("Data directory is empty. Initializing...")
 
-		// Run clone_repos.py
-		log.Println("Cloning Clarity code samples...")
-		if err := runPythonScript(cloneReposScript); err != nil {
-			return err
-		}
-		log.Println("Code samples cloned successfully")
-
-		// Run clone_docs.py
-		log.Println("Cloning Clarity documentation...")
-		if err := runPythonScript(cloneDocsScript); err != nil {
+		// Run clone_repos.py and clone_docs.py in parallel; they are network-bound
+		// and write to separate directories.
+		log.Println("Cloning Clarity code samples and documentation...")
+		if err := runPythonScriptsConcurrently(cloneReposScript, cloneDocsScript); err != nil {
 			return err
 		}
-		log.Println("Documentation cloned successfully")
+		log.Println("Code samples and documentation cloned successfully")
 
+		// Ingestion stays sequential: both scripts write to the same ChromaDB store.
 		// Run ingest_samples.py
 		log.Println("Ingesting code samples into ChromaDB...")
 		if err := runPythonScript(ingestSamplesScript); err != nil {
@@ -180,7 +201,7 @@ func main() {
 	}
 
 	go func() {
-		if err := initializeDataIfNeeded(); err != nil {
+		if err := initializeDataIfNeeded(dataDir, chromaDBDir, needsInitialization); err != nil {
 			log.Printf("Failed to initialize data: %v", err)
 			middleware.SetMaintenanceMode(true, "Initialization failed. Please check server logs.")
 			return
@@ -198,17 +219,29 @@ func main() {
 	}
 	defer db.Close()
 
+	// Persist API key last_used_at timestamps in batches off the request path;
+	// the pending ones are flushed once more after the server shuts down
+	stopUsageFlusher := auth.StartAPIKeyUsageFlusher(db, 30*time.Second)
+
 	// Initialize query logging service
 	qr := querylog.NewRepository(db)
 	qs := querylog.NewService(qr)
 
-	// Set Gin mode
+	// Set Gin mode; debug mode (route dumps, debug warnings) must be opted into
 	if os.Getenv("GIN_MODE") == "" {
-		gin.SetMode(gin.DebugMode)
+		gin.SetMode(gin.ReleaseMode)
 	}
 
-	// Create Gin router
-	router := gin.Default()
+	// Create Gin router. The access log can be turned off on busy deployments,
+	// and forwarded headers are not parsed since nothing relies on the client IP.
+	router := gin.New()
+	if os.Getenv("ACCESS_LOG") != "false" {
+		router.Use(gin.Logger())
+	}
+	router.Use(gin.Recovery())
+	if err := router.SetTrustedProxies(nil); err != nil {
+		log.Fatalf("Failed to configure trusted proxies: %v", err)
+	}
 	router.Use(middleware.MaintenanceModeMiddleware())
 
 	// Setup routes
@@ -220,9 +253,34 @@ func main() {
 		port = "8080"
 	}
 
-	// Start server
-	log.Printf("Starting server on port %s...", port)
-	if err := router.Run(":" + port); err != nil {
-		log.Fatalf("Failed to start server: %v", err)
+	// Start server; SIGINT/SIGTERM drain in-flight requests before exiting
+	ctx, stop := signal.NotifyContext(context.Background(), os.Interrupt, syscall.SIGTERM)
+	defer stop()
+
+	server := &http.Server{
+		Addr:    ":" + port,
+		Handler: router,
 	}
+	serverErr := make(chan error, 1)
+	go func() {
+		log.Printf("Starting server on port %s...", port)
+		serverErr <- server.ListenAndServe()
+	}()
+
+	select {
+	case err := <-serverErr:
+		if !errors.Is(err, http.ErrServerClosed) {
+			stopUsageFlusher()
+			log.Fatalf("Failed to start server: %v", err)
+		}
+	case <-ctx.Done():
+		log.Printf("Shutting down server...")
+		shutdownCtx, cancel := context.WithTimeout(context.Background(), 15*time.Second)
+		defer cancel()
+		if err := server.Shutdown(shutdownCtx); err != nil {
+			log.Printf("Server shutdown: %v", err)
+		}
+	}
+
+	stopUsageFlusher()
 }
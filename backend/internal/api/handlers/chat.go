@@ -28,6 +28,7 @@ type ChatCompletionRequest struct {
 	Messages       []ChatMessage `json:"messages" binding:"required"`
 	Temperature    float64       `json:"temperature"`
 	MaxTokens      int           `json:"max_tokens"`
+	Stream         bool          `json:"stream"`
 	ConversationID *int64        `json:"conversation_id,omitempty"`
 }
 
@@ -58,6 +59,8 @@ type ChatCompletionUsage struct {
 
 // ChatCompletions handles OpenAI-compatible chat completion requests
 func ChatCompletions(db *sql.DB) gin.HandlerFunc {
+	repo := conversation.NewRepository(db)
+
 	return func(c *gin.Context) {
 		var req ChatCompletionRequest
 		if err := c.ShouldBindJSON(&req); err != nil {
@@ -99,7 +102,6 @@ func ChatCompletions(db *sql.DB) gin.HandlerFunc {
 			return
 		}
 
-		repo := conversation.NewRepository(db)
 		convo, err := loadConversation(c, repo, req.ConversationID, userID)
 		if err != nil {
 			if errors.Is(err, conversation.ErrConversationNotFound) {
@@ -118,13 +120,21 @@ func ChatCompletions(db *sql.DB) gin.HandlerFunc {
 		convo.NewMessage = query
 		conversationAwareQuery := buildConversationAwareQuery(convo, query)
 
+		provider := codegen.ProviderFromEnv()
+		completionID := "chatcmpl-" + uuid.New().String()
+		created := time.Now().Unix()
+		model := resolveModel(req.Model, provider)
+
+		var stream *chatStream
+		if req.Stream {
+			stream = startChatStream(c, completionID, model, created)
+		}
+
 		// Get services
 		ragService, err := getRAGService()
 		if err != nil {
 			log.Printf("Failed to initialize RAG service: %v", err)
-			c.JSON(http.StatusInternalServerError, gin.H{
-				"error": "Failed to initialize RAG service: " + err.Error(),
-			})
+			respondChatError(c, stream, "Failed to initialize RAG service: "+err.Error())
 			return
 		}
 
@@ -132,23 +142,18 @@ func ChatCompletions(db *sql.DB) gin.HandlerFunc {
 		ragResponse, err := ragService.RetrieveContext(c.Request.Context(), query, 5)
 		if err != nil {
 			log.Printf("Failed to retrieve context: %v", err)
-			c.JSON(http.StatusInternalServerError, gin.H{
-				"error": "Failed to retrieve context: " + err.Error(),
-			})
+			respondChatError(c, stream, "Failed to retrieve context: "+err.Error())
 			return
 		}
 
 		ragContextsCount := len(ragResponse.CodeContexts) + len(ragResponse.DocsContexts)
 
-		provider := codegen.ProviderFromEnv()
 		c.Set(middleware.QueryLogModelProvider, provider)
 		c.Set(middleware.QueryLogRAGContextsCount, ragContextsCount)
 		codegenService, err := getCodegenService(provider)
 		if err != nil {
 			log.Printf("Failed to initialize %s service: %v", provider, err)
-			c.JSON(http.StatusInternalServerError, gin.H{
-				"error": "Failed to initialize code generation service: " + err.Error(),
-			})
+			respondChatError(c, stream, "Failed to initialize code generation service: "+err.Error())
 			return
 		}
 
@@ -163,9 +168,7 @@ func ChatCompletions(db *sql.DB) gin.HandlerFunc {
 		)
 		if err != nil {
 			log.Printf("Failed to generate response: %v", err)
-			c.JSON(http.StatusInternalServerError, gin.H{
-				"error": "Failed to generate response: " + err.Error(),
-			})
+			respondChatError(c, stream, "Failed to generate response: "+err.Error())
 			return
 		}
 
@@ -184,10 +187,10 @@ func ChatCompletions(db *sql.DB) gin.HandlerFunc {
 
 		// Create OpenAI-compatible response
 		response := ChatCompletionResponse{
-			ID:      "chatcmpl-" + uuid.New().String(),
+			ID:      completionID,
 			Object:  "chat.completion",
-			Created: time.Now().Unix(),
-			Model:   resolveModel(req.Model, provider),
+			Created: created,
+			Model:   model,
 			Choices: []ChatCompletionChoice{
 				{
 					Index: 0,
@@ -207,15 +210,19 @@ func ChatCompletions(db *sql.DB) gin.HandlerFunc {
 
 		if err := repo.Save(c.Request.Context(), convo); err != nil {
 			log.Printf("Failed to persist conversation: %v", err)
-			c.JSON(http.StatusInternalServerError, gin.H{
-				"error": "Failed to persist conversation",
-			})
+			respondChatError(c, stream, "Failed to persist conversation")
 			return
 		}
 
 		response.ConversationID = convo.ID
 		c.Set(middleware.QueryLogConversationID, convo.ID)
 
+		if stream != nil {
+			stream.content(assistantMessage)
+			stream.finish(response.Usage, convo.ID)
+			return
+		}
+
 		c.JSON(http.StatusOK, response)
 	}
 }
@@ -260,7 +267,7 @@ func buildConversationAwareQuery(convo *conversation.Conversation, query string)
 
 	var builder strings.Builder
 	builder.WriteString(history)
-	builder.WriteString("Current user request:\n")
+	builder.WriteString("\n\nCurrent user request:\n")
 	builder.WriteString(query)
 	return builder.String()
 }
@@ -0,0 +1,127 @@
+package handlers
+
+import (
+	"encoding/json"
+	"fmt"
+	"log"
+	"net/http"
+
+	"github.com/gin-gonic/gin"
+
+	"github.com/Quantum3-Labs/stacks-builder/backend/internal/api/middleware"
+)
+
+// ChatCompletionChunk represents an OpenAI-compatible streamed chat completion chunk
+type ChatCompletionChunk struct {
+	ID             string                      `json:"id"`
+	Object         string                      `json:"object"`
+	Created        int64                       `json:"created"`
+	Model          string                      `json:"model"`
+	Choices        []ChatCompletionChunkChoice `json:"choices"`
+	Usage          *ChatCompletionUsage        `json:"usage,omitempty"`
+	ConversationID int64                       `json:"conversation_id,omitempty"`
+}
+
+// ChatCompletionChunkChoice represents a choice delta in a streamed chunk
+type ChatCompletionChunkChoice struct {
+	Index        int              `json:"index"`
+	Delta        ChatMessageDelta `json:"delta"`
+	FinishReason *string          `json:"finish_reason"`
+}
+
+// ChatMessageDelta represents the incremental message content of a streamed chunk
+type ChatMessageDelta struct {
+	Role    string `json:"role,omitempty"`
+	Content string `json:"content,omitempty"`
+}
+
+// chatStream writes a chat completion as server-sent events. The headers and the
+// assistant role are sent up front so clients get a first byte before retrieval
+// and generation finish.
+type chatStream struct {
+	c       *gin.Context
+	id      string
+	model   string
+	created int64
+}
+
+func startChatStream(c *gin.Context, id, model string, created int64) *chatStream {
+	c.Header("Content-Type", "text/event-stream")
+	c.Header("Cache-Control", "no-cache")
+	c.Header("Connection", "keep-alive")
+	c.Header("X-Accel-Buffering", "no")
+	c.Status(http.StatusOK)
+
+	stream := &chatStream{c: c, id: id, model: model, created: created}
+	stream.send(stream.chunk(ChatMessageDelta{Role: "assistant"}, nil))
+	return stream
+}
+
+func (s *chatStream) chunk(delta ChatMessageDelta, finishReason *string) ChatCompletionChunk {
+	return ChatCompletionChunk{
+		ID:      s.id,
+		Object:  "chat.completion.chunk",
+		Created: s.created,
+		Model:   s.model,
+		Choices: []ChatCompletionChunkChoice{
+			{
+				Index:        0,
+				Delta:        delta,
+				FinishReason: finishReason,
+			},
+		},
+	}
+}
+
+func (s *chatStream) send(payload interface{}) {
+	data, err := json.Marshal(payload)
+	if err != nil {
+		log.Printf("Failed to marshal stream chunk: %v", err)
+		return
+	}
+	fmt.Fprintf(s.c.Writer, "data: %s\n\n", data)
+	s.c.Writer.Flush()
+}
+
+func (s *chatStream) done() {
+	fmt.Fprint(s.c.Writer, "data: [DONE]\n\n")
+	s.c.Writer.Flush()
+}
+
+// content sends the assistant message text.
+func (s *chatStream) content(text string) {
+	s.send(s.chunk(ChatMessageDelta{Content: text}, nil))
+}
+
+// finish sends the final chunk with usage and closes the stream.
+func (s *chatStream) finish(usage ChatCompletionUsage, conversationID int64) {
+	stop := "stop"
+	final := s.chunk(ChatMessageDelta{}, &stop)
+	final.Usage = &usage
+	final.ConversationID = conversationID
+	s.send(final)
+	s.done()
+}
+
+// fail reports an error once the stream has started and closes it.
+func (s *chatStream) fail(message string) {
+	s.send(gin.H{
+		"error": gin.H{
+			"message": message,
+		},
+	})
+	s.done()
+}
+
+// respondChatError reports a server-side failure either as a JSON error or, once a
+// stream has started, as an error event (the status code is already sent by then).
+func respondChatError(c *gin.Context, stream *chatStream, message string) {
+	if stream != nil {
+		c.Set(middleware.QueryLogErrorMessage, message)
+		stream.fail(message)
+		return
+	}
+	c.JSON(http.StatusInternalServerError, gin.H{
+		"error": message,
+	})
+}
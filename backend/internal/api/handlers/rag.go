@@ -2,10 +2,11 @@ package handlers
 
 import (
 	"database/sql"
-	"fmt"
 	"log"
 	"net/http"
+	"strconv"
 	"strings"
+	"sync"
 
 	"github.com/Quantum3-Labs/stacks-builder/backend/internal/api/middleware"
 	"github.com/Quantum3-Labs/stacks-builder/backend/internal/codegen"
@@ -26,14 +27,19 @@ type GenerateCodeRequest struct {
 	MaxTokens   int     `json:"max_tokens"`
 }
 
-// Service singletons
+// Service singletons; serviceMu keeps concurrent first requests from each
+// building their own instance
 var (
+	serviceMu               sync.Mutex
 	ragServiceInstance      *rag.Service
 	codegenServiceInstances map[string]codegen.Service
 )
 
 // getRAGService creates or returns a RAG service instance
 func getRAGService() (*rag.Service, error) {
+	serviceMu.Lock()
+	defer serviceMu.Unlock()
+
 	if ragServiceInstance == nil {
 		service, err := rag.NewServiceFromEnv()
 		if err != nil {
@@ -46,11 +52,21 @@ func getRAGService() (*rag.Service, error) {
 
 // getCodegenService creates or returns a code generation service instance for the provider.
 func getCodegenService(provider string) (codegen.Service, error) {
+	serviceMu.Lock()
+	defer serviceMu.Unlock()
+
 	if codegenServiceInstances == nil {
 		codegenServiceInstances = make(map[string]codegen.Service)
 	}
 
+	// Unknown providers fall back to Gemini; normalize before the lookup so
+	// they hit the cached instance instead of building a new client each call
 	normalized := strings.ToLower(provider)
+	switch normalized {
+	case codegen.ProviderOpenAI, codegen.ProviderClaude:
+	default:
+		normalized = codegen.ProviderGemini
+	}
 	if service, ok := codegenServiceInstances[normalized]; ok {
 		return service, nil
 	}
@@ -66,7 +82,6 @@ func getCodegenService(provider string) (codegen.Service, error) {
 	case codegen.ProviderClaude:
 		service, err = codegen.NewClaudeServiceFromEnv()
 	default:
-		normalized = codegen.ProviderGemini
 		service, err = codegen.NewGeminiServiceFromEnv()
 	}
 	if err != nil {
@@ -77,6 +92,46 @@ func getCodegenService(provider string) (codegen.Service, error) {
 	return service, nil
 }
 
+// formatRetrievedContext renders retrieved contexts as markdown sections. The
+// buffer is sized once and filled with plain writes; formatting each context
+// through Sprintf copied every context an extra time.
+func formatRetrievedContext(codeContexts, docContexts []string) string {
+	size := 64 + 48*(len(codeContexts)+len(docContexts))
+	for _, context := range codeContexts {
+		size += len(context)
+	}
+	for _, doc := range docContexts {
+		size += len(doc)
+	}
+
+	var formatted strings.Builder
+	formatted.Grow(size)
+
+	if len(codeContexts) > 0 {
+		formatted.WriteString("## Code Contexts:\n\n")
+		for i, context := range codeContexts {
+			formatted.WriteString("### Code Context ")
+			formatted.WriteString(strconv.Itoa(i + 1))
+			formatted.WriteString(":\n```clarity\n")
+			formatted.WriteString(context)
+			formatted.WriteString("\n```\n\n")
+		}
+	}
+
+	if len(docContexts) > 0 {
+		formatted.WriteString("## Documentation Contexts:\n\n")
+		for i, doc := range docContexts {
+			formatted.WriteString("### Documentation Context ")
+			formatted.WriteString(strconv.Itoa(i + 1))
+			formatted.WriteString(":\n```text\n")
+			formatted.WriteString(doc)
+			formatted.WriteString("\n```\n\n")
+		}
+	}
+
+	return formatted.String()
+}
+
 // RetrieveContext retrieves relevant Clarity code context from ChromaDB
 func RetrieveContext(db *sql.DB) gin.HandlerFunc {
 	return func(c *gin.Context) {
@@ -113,23 +168,7 @@ func RetrieveContext(db *sql.DB) gin.HandlerFunc {
 			return
 		}
 
-		var formatted strings.Builder
-
-		if len(response.CodeContexts) > 0 {
-			formatted.WriteString("## Code Contexts:\n\n")
-			for i, context := range response.CodeContexts {
-				formatted.WriteString(fmt.Sprintf("### Code Context %d:\n```clarity\n%s\n```\n\n", i+1, context))
-			}
-		}
-
-		if len(response.DocsContexts) > 0 {
-			formatted.WriteString("## Documentation Contexts:\n\n")
-			for i, doc := range response.DocsContexts {
-				formatted.WriteString(fmt.Sprintf("### Documentation Context %d:\n```text\n%s\n```\n\n", i+1, doc))
-			}
-		}
-
-		formattedContext := formatted.String()
+		formattedContext := formatRetrievedContext(response.CodeContexts, response.DocsContexts)
 		response.FormattedContext = formattedContext
 		c.Set(middleware.QueryLogRAGContextsCount, len(response.CodeContexts)+len(response.DocsContexts))
 
@@ -1,10 +1,8 @@
 package middleware
 
 import (
-	"crypto/sha256"
 	"database/sql"
 	"encoding/base64"
-	"encoding/hex"
 	"net/http"
 	"strings"
 	"time"
@@ -76,19 +74,8 @@ func APIKeyAuth(db *sql.DB) gin.HandlerFunc {
 			return
 		}
 
-		// Hash the API key
-		hash := sha256.Sum256([]byte(apiKey))
-		keyHash := hex.EncodeToString(hash[:])
-
 		// Verify API key exists and is valid
-		var keyID, userID int
-		var expiresAt sql.NullTime
-		err := db.QueryRow(`
-			SELECT id, user_id, expires_at
-			FROM api_keys
-			WHERE api_key_hash = ?
-		`, keyHash).Scan(&keyID, &userID, &expiresAt)
-
+		record, err := auth.LookupAPIKey(db, apiKey)
 		if err == sql.ErrNoRows {
 			c.JSON(http.StatusUnauthorized, gin.H{"error": "Invalid API key"})
 			c.Abort()
@@ -100,19 +87,22 @@ func APIKeyAuth(db *sql.DB) gin.HandlerFunc {
 			return
 		}
 
+		if !record.IsActive {
+			c.JSON(http.StatusUnauthorized, gin.H{"error": "API key revoked"})
+			c.Abort()
+			return
+		}
+
 		// Check if key is expired
-		if expiresAt.Valid && expiresAt.Time.Before(time.Now()) {
+		if record.ExpiresAt.Valid && record.ExpiresAt.Time.Before(time.Now()) {
 			c.JSON(http.StatusUnauthorized, gin.H{"error": "API key expired"})
 			c.Abort()
 			return
 		}
 
-		// Update last_used_at
-		_, _ = db.Exec(`UPDATE api_keys SET last_used_at = ? WHERE id = ?`, time.Now(), keyID)
-
 		// Store user_id in context for handlers to use
-		c.Set("user_id", userID)
-		c.Set("api_key_id", keyID)
+		c.Set("user_id", record.UserID)
+		c.Set("api_key_id", record.ID)
 
 		c.Next()
 	}
@@ -1,18 +1,54 @@
 package middleware
 
 import (
+	"os"
+	"strings"
+
 	"github.com/gin-gonic/gin"
 )
 
-// CORS middleware for handling cross-origin requests
+const (
+	corsAllowHeaders = "Content-Type, Content-Length, Accept-Encoding, X-CSRF-Token, Authorization, accept, origin, Cache-Control, X-Requested-With, x-api-key"
+	corsAllowMethods = "POST, OPTIONS, GET, PUT, DELETE"
+	// Browsers may reuse a preflight result for this many seconds.
+	corsMaxAge = "86400"
+)
+
+// CORS middleware for handling cross-origin requests.
+// Allowed origins are read once from CORS_ALLOWED_ORIGINS (comma-separated);
+// when it is unset any origin is allowed, without credentials.
 func CORS() gin.HandlerFunc {
+	allowed := make(map[string]struct{})
+	for _, origin := range strings.Split(os.Getenv("CORS_ALLOWED_ORIGINS"), ",") {
+		if origin = strings.TrimSpace(origin); origin != "" {
+			allowed[origin] = struct{}{}
+		}
+	}
+	allowAny := len(allowed) == 0
+
 	return func(c *gin.Context) {
-		c.Writer.Header().Set("Access-Control-Allow-Origin", "*")
-		c.Writer.Header().Set("Access-Control-Allow-Credentials", "true")
-		c.Writer.Header().Set("Access-Control-Allow-Headers", "Content-Type, Content-Length, Accept-Encoding, X-CSRF-Token, Authorization, accept, origin, Cache-Control, X-Requested-With, x-api-key")
-		c.Writer.Header().Set("Access-Control-Allow-Methods", "POST, OPTIONS, GET, PUT, DELETE")
+		origin := c.GetHeader("Origin")
+		if origin == "" {
+			// Not a cross-origin request; nothing to add.
+			c.Next()
+			return
+		}
+
+		header := c.Writer.Header()
+		if allowAny {
+			header.Set("Access-Control-Allow-Origin", "*")
+		} else {
+			header.Add("Vary", "Origin")
+			if _, ok := allowed[origin]; ok {
+				header.Set("Access-Control-Allow-Origin", origin)
+				header.Set("Access-Control-Allow-Credentials", "true")
+			}
+		}
+		header.Set("Access-Control-Allow-Headers", corsAllowHeaders)
+		header.Set("Access-Control-Allow-Methods", corsAllowMethods)
 
 		if c.Request.Method == "OPTIONS" {
+			header.Set("Access-Control-Max-Age", corsMaxAge)
 			c.AbortWithStatus(204)
 			return
 		}
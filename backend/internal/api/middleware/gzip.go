@@ -0,0 +1,97 @@
+package middleware
+
+import (
+	"bytes"
+	"compress/gzip"
+	"log"
+	"strconv"
+	"strings"
+
+	"github.com/gin-gonic/gin"
+)
+
+// gzipWriter buffers the response body so it can be compressed once the handler is done.
+type gzipWriter struct {
+	gin.ResponseWriter
+	body *bytes.Buffer
+}
+
+func (w *gzipWriter) Write(b []byte) (int, error) {
+	return w.body.Write(b)
+}
+
+func (w *gzipWriter) WriteString(s string) (int, error) {
+	return w.body.WriteString(s)
+}
+
+// Flush is a no-op: the buffered body is written after the handler returns.
+func (w *gzipWriter) Flush() {}
+
+// acceptsGzip reports whether an Accept-Encoding header allows gzip. An explicit
+// gzip entry decides, otherwise a "*" entry does; a q value of 0 refuses the coding.
+func acceptsGzip(acceptEncoding string) bool {
+	wildcard := false
+	for _, entry := range strings.Split(acceptEncoding, ",") {
+		coding, params, _ := strings.Cut(entry, ";")
+		coding = strings.ToLower(strings.TrimSpace(coding))
+		if coding != "gzip" && coding != "*" {
+			continue
+		}
+
+		accepted := true
+		for _, param := range strings.Split(params, ";") {
+			name, value, ok := strings.Cut(param, "=")
+			if ok && strings.EqualFold(strings.TrimSpace(name), "q") {
+				q, err := strconv.ParseFloat(strings.TrimSpace(value), 64)
+				accepted = err == nil && q > 0
+			}
+		}
+
+		if coding == "gzip" {
+			return accepted
+		}
+		wildcard = accepted
+	}
+	return wildcard
+}
+
+// Gzip compresses response bodies of at least minSize bytes for clients that accept gzip.
+// Smaller bodies are sent unchanged. It buffers the whole response, so it must not be
+// used on streaming routes.
+func Gzip(minSize int) gin.HandlerFunc {
+	return func(c *gin.Context) {
+		if !acceptsGzip(c.GetHeader("Accept-Encoding")) {
+			c.Next()
+			return
+		}
+
+		original := c.Writer
+		writer := &gzipWriter{ResponseWriter: original, body: &bytes.Buffer{}}
+		c.Writer = writer
+
+		c.Next()
+
+		c.Writer = original
+		body := writer.body.Bytes()
+		header := original.Header()
+		header.Add("Vary", "Accept-Encoding")
+
+		if len(body) < minSize || header.Get("Content-Encoding") != "" {
+			if _, err := original.Write(body); err != nil {
+				log.Printf("Failed to write response: %v", err)
+			}
+			return
+		}
+
+		header.Set("Content-Encoding", "gzip")
+		header.Del("Content-Length")
+
+		gz := gzip.NewWriter(original)
+		if _, err := gz.Write(body); err != nil {
+			log.Printf("Failed to write compressed response: %v", err)
+		}
+		if err := gz.Close(); err != nil {
+			log.Printf("Failed to write compressed response: %v", err)
+		}
+	}
+}
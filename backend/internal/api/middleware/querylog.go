@@ -110,8 +110,11 @@ func QueryLogMiddleware(service *querylog.Service, trackedEndpoints []string) gi
 			}
 		}
 		if errMsg, ok := c.Get(QueryLogErrorMessage); ok {
-			if v, ok := errMsg.(string); ok {
+			if v, ok := errMsg.(string); ok && v != "" {
 				logEntry.ErrorMessage = v
+				// A streamed response fails after its 200 status is sent, so
+				// the status code alone would record it as a success
+				logEntry.Status = "error"
 			}
 		}
 
@@ -15,6 +15,9 @@ import (
 	_ "github.com/Quantum3-Labs/stacks-builder/backend/docs" // Import generated docs
 )
 
+// gzipMinSize is the smallest RAG response body worth compressing.
+const gzipMinSize = 1024
+
 // SetupRoutes configures all API routes
 func SetupRoutes(router *gin.Engine, db *sql.DB, qlRepo *querylog.Repository, qlService *querylog.Service) {
 	// Swagger documentation
@@ -70,6 +73,7 @@ func SetupRoutes(router *gin.Engine, db *sql.DB, qlRepo *querylog.Repository, ql
 		rag := v1.Group("/rag")
 		rag.Use(
 			middleware.APIKeyAuth(db),
+			middleware.Gzip(gzipMinSize),
 			middleware.QueryLogMiddleware(qlService, []string{"/api/v1/rag/retrieve", "/api/v1/rag/generate"}),
 		)
 		{
@@ -0,0 +1,147 @@
+package auth
+
+import (
+	"database/sql"
+	"log"
+	"sync"
+	"time"
+
+	"github.com/Quantum3-Labs/stacks-builder/backend/internal/cache"
+)
+
+const (
+	apiKeyCacheSize = 10000
+	apiKeyCacheTTL  = 60 * time.Second
+
+	// Unknown keys are remembered briefly so a client retrying a bad key does not
+	// hit the database on every request; the short TTL and size bound the exposure.
+	unknownKeyCacheSize = 4096
+	unknownKeyCacheTTL  = 10 * time.Second
+)
+
+// APIKeyRecord is the subset of an api_keys row needed to authenticate a request.
+type APIKeyRecord struct {
+	ID        int
+	UserID    int
+	IsActive  bool
+	ExpiresAt sql.NullTime
+}
+
+// apiKeyUsage collects last_used_at updates so they can be written in one transaction.
+type apiKeyUsage struct {
+	mu      sync.Mutex
+	pending map[int]time.Time
+}
+
+func (u *apiKeyUsage) mark(keyID int, usedAt time.Time) {
+	u.mu.Lock()
+	u.pending[keyID] = usedAt
+	u.mu.Unlock()
+}
+
+func (u *apiKeyUsage) drain() map[int]time.Time {
+	u.mu.Lock()
+	defer u.mu.Unlock()
+
+	pending := u.pending
+	u.pending = make(map[int]time.Time)
+	return pending
+}
+
+var (
+	keyCache    = cache.NewTTL[APIKeyRecord](apiKeyCacheSize, apiKeyCacheTTL)
+	unknownKeys = cache.NewTTL[struct{}](unknownKeyCacheSize, unknownKeyCacheTTL)
+	keyUsage    = &apiKeyUsage{pending: make(map[int]time.Time)}
+)
+
+// LookupAPIKey returns the stored record for the API key and records the key as used.
+// Repeat lookups are served from memory and their usage is flushed in batches; on a
+// cache miss the row is read and last_used_at refreshed in a single statement.
+// It returns sql.ErrNoRows when the key does not exist.
+func LookupAPIKey(db *sql.DB, apiKey string) (APIKeyRecord, error) {
+	keyHash := HashAPIKey(apiKey)
+	if record, ok := keyCache.Get(keyHash); ok {
+		keyUsage.mark(record.ID, time.Now())
+		return record, nil
+	}
+	if _, ok := unknownKeys.Get(keyHash); ok {
+		return APIKeyRecord{}, sql.ErrNoRows
+	}
+
+	var record APIKeyRecord
+	err := db.QueryRow(`
+		UPDATE api_keys
+		SET last_used_at = ?
+		WHERE api_key_hash = ?
+		RETURNING id, user_id, is_active, expires_at
+	`, time.Now(), keyHash).Scan(&record.ID, &record.UserID, &record.IsActive, &record.ExpiresAt)
+	if err == sql.ErrNoRows {
+		unknownKeys.Put(keyHash, struct{}{})
+	}
+	if err != nil {
+		return APIKeyRecord{}, err
+	}
+
+	keyCache.Put(keyHash, record)
+	return record, nil
+}
+
+// FlushAPIKeyUsage writes all pending last_used_at updates in a single transaction.
+func FlushAPIKeyUsage(db *sql.DB) error {
+	pending := keyUsage.drain()
+	if len(pending) == 0 {
+		return nil
+	}
+
+	tx, err := db.Begin()
+	if err != nil {
+		return err
+	}
+
+	stmt, err := tx.Prepare(`UPDATE api_keys SET last_used_at = ? WHERE id = ?`)
+	if err != nil {
+		_ = tx.Rollback()
+		return err
+	}
+	defer stmt.Close()
+
+	for keyID, usedAt := range pending {
+		if _, err := stmt.Exec(usedAt, keyID); err != nil {
+			_ = tx.Rollback()
+			return err
+		}
+	}
+
+	return tx.Commit()
+}
+
+// StartAPIKeyUsageFlusher persists pending API key usage every interval.
+// The returned function stops the flusher after a final flush.
+func StartAPIKeyUsageFlusher(db *sql.DB, interval time.Duration) func() {
+	ticker := time.NewTicker(interval)
+	done := make(chan struct{})
+	stopped := make(chan struct{})
+
+	go func() {
+		defer close(stopped)
+		for {
+			select {
+			case <-ticker.C:
+				if err := FlushAPIKeyUsage(db); err != nil {
+					log.Printf("Failed to flush API key usage: %v", err)
+				}
+			case <-done:
+				ticker.Stop()
+				if err := FlushAPIKeyUsage(db); err != nil {
+					log.Printf("Failed to flush API key usage: %v", err)
+				}
+				return
+			}
+		}
+	}()
+
+	return func() {
+		close(done)
+		<-stopped
+	}
+}
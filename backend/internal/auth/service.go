@@ -6,9 +6,10 @@ import (
 	"database/sql"
 	"encoding/hex"
 	"errors"
-	"math/big"
 	"time"
 
+	"github.com/Quantum3-Labs/stacks-builder/backend/internal/cache"
+	"github.com/mattn/go-sqlite3"
 	"golang.org/x/crypto/bcrypt"
 )
 
@@ -16,8 +17,15 @@ const (
 	apiKeyCharset = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
 	apiKeyLength  = 32
 	apiKeyPrefix  = "mk_"
+
+	authCacheSize = 2048
+	authCacheTTL  = 5 * time.Minute
 )
 
+// authCache remembers recently verified credentials so repeated Basic Auth
+// requests skip the database round-trip and the bcrypt comparison.
+var authCache = cache.NewTTL[User](authCacheSize, authCacheTTL)
+
 // HashPassword hashes a password using bcrypt.
 func HashPassword(password string) (string, error) {
 	hashed, err := bcrypt.GenerateFromPassword([]byte(password), bcrypt.DefaultCost)
@@ -29,13 +37,25 @@ func HashPassword(password string) (string, error) {
 
 // GenerateAPIKey returns a random API key with the configured prefix.
 func GenerateAPIKey() (string, error) {
-	buf := make([]byte, apiKeyLength)
-	for i := range buf {
-		num, err := rand.Int(rand.Reader, big.NewInt(int64(len(apiKeyCharset))))
-		if err != nil {
+	// Draw random bytes in bulk and map them onto the charset, rejecting bytes
+	// above the largest multiple of len(apiKeyCharset) to keep the mapping uniform.
+	const maxByte = 256 - 256%len(apiKeyCharset)
+
+	buf := make([]byte, 0, apiKeyLength)
+	random := make([]byte, apiKeyLength*2)
+	for len(buf) < apiKeyLength {
+		if _, err := rand.Read(random); err != nil {
 			return "", err
 		}
-		buf[i] = apiKeyCharset[num.Int64()]
+		for _, b := range random {
+			if int(b) >= maxByte {
+				continue
+			}
+			buf = append(buf, apiKeyCharset[int(b)%len(apiKeyCharset)])
+			if len(buf) == apiKeyLength {
+				break
+			}
+		}
 	}
 
 	return apiKeyPrefix + string(buf), nil
@@ -100,8 +120,19 @@ func CreateUser(db *sql.DB, username, password string, email *string, role strin
 	return int(userID), nil
 }
 
+// credentialsCacheKey derives the authCache key without keeping the plain-text password.
+func credentialsCacheKey(username, password string) string {
+	hash := sha256.Sum256([]byte(username + "\x00" + password))
+	return hex.EncodeToString(hash[:])
+}
+
 // AuthenticateUser validates the provided credentials and returns the user.
 func AuthenticateUser(db *sql.DB, username, password string) (*User, error) {
+	cacheKey := credentialsCacheKey(username, password)
+	if cached, ok := authCache.Get(cacheKey); ok {
+		return &cached, nil
+	}
+
 	var user User
 	err := db.QueryRow(`
 		SELECT id, username, password_hash, email, created_at, is_active, role
@@ -129,13 +160,21 @@ func AuthenticateUser(db *sql.DB, username, password string) (*User, error) {
 	}
 
 	user.PasswordHash = ""
+	authCache.Put(cacheKey, user)
 	return &user, nil
 }
 
 // CreateAPIKey creates a new API key for the given user.
 func CreateAPIKey(db *sql.DB, userID int, name string) (*APIKeyResponse, error) {
+	if name == "" {
+		name = "API Key " + time.Now().Format("2006-01-02 15:04")
+	}
+
+	// Rely on the UNIQUE constraint on api_key_hash instead of checking first;
+	// a collision is astronomically unlikely, so the insert almost always succeeds once.
 	var (
 		apiKey string
+		result sql.Result
 		err    error
 	)
 
@@ -145,34 +184,20 @@ func CreateAPIKey(db *sql.DB, userID int, name string) (*APIKeyResponse, error)
 			return nil, err
 		}
 
-		keyHash := HashAPIKey(apiKey)
-		var exists bool
-		err = db.QueryRow("SELECT EXISTS(SELECT 1 FROM api_keys WHERE api_key_hash = ?)", keyHash).Scan(&exists)
-		if err != nil {
-			return nil, err
-		}
-		if !exists {
+		result, err = db.Exec(`
+			INSERT INTO api_keys (user_id, api_key_hash, api_key_prefix, name)
+			VALUES (?, ?, ?, ?)
+		`, userID, HashAPIKey(apiKey), GetAPIKeyPrefix(apiKey), name)
+		if err == nil {
 			break
 		}
-
-		if attempt == 9 {
-			return nil, errors.New("failed to generate unique API key")
+		var sqliteErr sqlite3.Error
+		if !errors.As(err, &sqliteErr) || sqliteErr.ExtendedCode != sqlite3.ErrConstraintUnique {
+			return nil, err
 		}
 	}
-
-	if name == "" {
-		name = "API Key " + time.Now().Format("2006-01-02 15:04")
-	}
-
-	keyHash := HashAPIKey(apiKey)
-	keyPrefix := GetAPIKeyPrefix(apiKey)
-
-	result, err := db.Exec(`
-		INSERT INTO api_keys (user_id, api_key_hash, api_key_prefix, name)
-		VALUES (?, ?, ?, ?)
-	`, userID, keyHash, keyPrefix, name)
 	if err != nil {
-		return nil, err
+		return nil, errors.New("failed to generate unique API key")
 	}
 
 	keyID, err := result.LastInsertId()
@@ -184,26 +209,14 @@ func CreateAPIKey(db *sql.DB, userID int, name string) (*APIKeyResponse, error)
 		ID:        int(keyID),
 		APIKey:    apiKey,
 		Name:      name,
-		Prefix:    keyPrefix,
+		Prefix:    GetAPIKeyPrefix(apiKey),
 		CreatedAt: time.Now(),
 	}, nil
 }
 
 // ValidateAPIKey verifies the provided API key and returns the associated user ID.
 func ValidateAPIKey(db *sql.DB, apiKey string) (int, error) {
-	keyHash := HashAPIKey(apiKey)
-
-	var (
-		userID    int
-		isActive  bool
-		expiresAt sql.NullTime
-	)
-
-	err := db.QueryRow(`
-		SELECT user_id, is_active, expires_at
-		FROM api_keys
-		WHERE api_key_hash = ?
-	`, keyHash).Scan(&userID, &isActive, &expiresAt)
+	record, err := LookupAPIKey(db, apiKey)
 	if err == sql.ErrNoRows {
 		return 0, errors.New("invalid API key")
 	}
@@ -211,17 +224,15 @@ func ValidateAPIKey(db *sql.DB, apiKey string) (int, error) {
 		return 0, err
 	}
 
-	if !isActive {
+	if !record.IsActive {
 		return 0, errors.New("API key has been revoked")
 	}
 
-	if expiresAt.Valid && expiresAt.Time.Before(time.Now()) {
+	if record.ExpiresAt.Valid && record.ExpiresAt.Time.Before(time.Now()) {
 		return 0, errors.New("API key has expired")
 	}
 
-	_, _ = db.Exec("UPDATE api_keys SET last_used_at = ? WHERE api_key_hash = ?", time.Now(), keyHash)
-
-	return userID, nil
+	return record.UserID, nil
 }
 
 // CompareAPIKey checks whether the provided key matches an active key for the user.
@@ -296,5 +307,9 @@ func RevokeAPIKey(db *sql.DB, userID, keyID int) error {
 		return errors.New("API key not found or not owned by user")
 	}
 
+	keyCache.RemoveFunc(func(record APIKeyRecord) bool {
+		return record.ID == keyID
+	})
+
 	return nil
 }
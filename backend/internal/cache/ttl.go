@@ -0,0 +1,94 @@
+// Package cache provides small in-memory caches shared by the backend services.
+package cache
+
+import (
+	"container/list"
+	"sync"
+	"time"
+)
+
+type ttlEntry[V any] struct {
+	key      string
+	value    V
+	cachedAt time.Time
+}
+
+// TTL is a bounded LRU whose entries expire after a fixed TTL.
+type TTL[V any] struct {
+	mu      sync.Mutex
+	size    int
+	ttl     time.Duration
+	order   *list.List
+	entries map[string]*list.Element
+}
+
+// NewTTL returns a cache holding at most size entries, each valid for ttl.
+func NewTTL[V any](size int, ttl time.Duration) *TTL[V] {
+	return &TTL[V]{
+		size:    size,
+		ttl:     ttl,
+		order:   list.New(),
+		entries: make(map[string]*list.Element),
+	}
+}
+
+// Get returns the cached value for key if present and not expired.
+func (c *TTL[V]) Get(key string) (V, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	var zero V
+	elem, ok := c.entries[key]
+	if !ok {
+		return zero, false
+	}
+
+	entry := elem.Value.(*ttlEntry[V])
+	if time.Since(entry.cachedAt) > c.ttl {
+		c.order.Remove(elem)
+		delete(c.entries, key)
+		return zero, false
+	}
+
+	c.order.MoveToFront(elem)
+	return entry.value, true
+}
+
+// Put stores value under key, evicting the least recently used entry when full.
+func (c *TTL[V]) Put(key string, value V) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	if elem, ok := c.entries[key]; ok {
+		entry := elem.Value.(*ttlEntry[V])
+		entry.value = value
+		entry.cachedAt = time.Now()
+		c.order.MoveToFront(elem)
+		return
+	}
+
+	c.entries[key] = c.order.PushFront(&ttlEntry[V]{
+		key:      key,
+		value:    value,
+		cachedAt: time.Now(),
+	})
+
+	if c.order.Len() > c.size {
+		oldest := c.order.Back()
+		c.order.Remove(oldest)
+		delete(c.entries, oldest.Value.(*ttlEntry[V]).key)
+	}
+}
+
+// RemoveFunc drops every entry whose value matches the predicate.
+func (c *TTL[V]) RemoveFunc(match func(V) bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	for key, elem := range c.entries {
+		if match(elem.Value.(*ttlEntry[V]).value) {
+			c.order.Remove(elem)
+			delete(c.entries, key)
+		}
+	}
+}
@@ -35,6 +35,7 @@ func NewClaudeService(apiKey, model, baseURL, apiVersion, systemMessage string)
 	// Build client options
 	opts := []option.RequestOption{
 		option.WithAPIKey(apiKey),
+		option.WithHTTPClient(providerHTTPClient),
 	}
 
 	// Add base URL if provided
@@ -24,8 +24,9 @@ type GeminiService struct {
 func NewGeminiService(apiKey string) (*GeminiService, error) {
 	ctx := context.Background()
 	client, err := genai.NewClient(ctx, &genai.ClientConfig{
-		APIKey:  apiKey,
-		Backend: genai.BackendGeminiAPI,
+		APIKey:     apiKey,
+		Backend:    genai.BackendGeminiAPI,
+		HTTPClient: providerHTTPClient,
 	})
 	if err != nil {
 		return nil, fmt.Errorf("failed to create genai client: %w", err)
@@ -57,24 +58,30 @@ func (s *GeminiService) GenerateCode(ctx context.Context, query string, codeCont
 		maxTokens = defaultGeminiMaxTokens
 	}
 
-	// Count input tokens
-	inputTokenCount, err := s.countTokens(ctx, prompt)
-	if err != nil {
-		log.Printf("Warning: failed to count input tokens: %v", err)
-		inputTokenCount = 0 // fallback to 0 if counting fails
-	}
-
 	// Call Gemini API
-	geminiResponse, err := s.callGemini(ctx, prompt, temperature, maxTokens)
+	geminiResponse, usage, err := s.callGemini(ctx, prompt, temperature, maxTokens)
 	if err != nil {
 		return nil, fmt.Errorf("failed to call Gemini API: %w", err)
 	}
 
-	// Count output tokens
-	outputTokenCount, err := s.countTokens(ctx, geminiResponse)
-	if err != nil {
-		log.Printf("Warning: failed to count output tokens: %v", err)
-		outputTokenCount = 0
+	// Token counts come back with the response; only fall back to separate
+	// CountTokens round trips when the usage metadata is missing
+	var inputTokenCount, outputTokenCount int
+	if usage != nil {
+		inputTokenCount = int(usage.PromptTokenCount)
+		outputTokenCount = int(usage.CandidatesTokenCount)
+	} else {
+		inputTokenCount, err = s.countTokens(ctx, prompt)
+		if err != nil {
+			log.Printf("Warning: failed to count input tokens: %v", err)
+			inputTokenCount = 0 // fallback to 0 if counting fails
+		}
+
+		outputTokenCount, err = s.countTokens(ctx, geminiResponse)
+		if err != nil {
+			log.Printf("Warning: failed to count output tokens: %v", err)
+			outputTokenCount = 0
+		}
 	}
 
 	// Parse and return response
@@ -90,8 +97,9 @@ func (s *GeminiService) GenerateCode(ctx context.Context, query string, codeCont
 	return parsedResponse, nil
 }
 
-// callGemini calls the Gemini API using the go-genai SDK
-func (s *GeminiService) callGemini(ctx context.Context, prompt string, temperature float64, maxTokens int) (string, error) {
+// callGemini calls the Gemini API using the go-genai SDK and returns the text
+// along with the usage metadata reported for the call
+func (s *GeminiService) callGemini(ctx context.Context, prompt string, temperature float64, maxTokens int) (string, *genai.GenerateContentResponseUsageMetadata, error) {
 	config := &genai.GenerateContentConfig{
 		Temperature:     genai.Ptr(float32(temperature)),
 	}
@@ -103,10 +111,10 @@ func (s *GeminiService) callGemini(ctx context.Context, prompt string, temperatu
 		config,
 	)
 	if err != nil {
-		return "", fmt.Errorf("generation failed: %w", err)
+		return "", nil, fmt.Errorf("generation failed: %w", err)
 	}
 
-	return result.Text(), nil
+	return result.Text(), result.UsageMetadata, nil
 }
 
 // parseGeminiResponse extracts code and explanation from Gemini's response
@@ -35,6 +35,7 @@ func NewOpenAIService(apiKey, model, baseURL, systemMessage string) *OpenAIServi
 	// Build client options
 	opts := []option.RequestOption{
 		option.WithAPIKey(apiKey),
+		option.WithHTTPClient(providerHTTPClient),
 	}
 	if baseURL != "" {
 		opts = append(opts, option.WithBaseURL(baseURL))
@@ -1,12 +1,30 @@
 package codegen
 
 import (
-	"fmt"
+	"strconv"
 	"strings"
 )
 
+// promptFixedSize covers the fixed instruction text; promptPerContextSize covers the
+// heading and fences written around each context.
+const (
+	promptFixedSize      = 480
+	promptPerContextSize = 40
+)
+
 func buildCodeGenerationInstruction(query string, codeContexts, docContexts []string) string {
+	// Size the buffer once up front; contexts are several KB in total and would
+	// otherwise be copied on every growth step.
+	size := promptFixedSize + len(query) + promptPerContextSize*(len(codeContexts)+len(docContexts))
+	for _, context := range codeContexts {
+		size += len(context)
+	}
+	for _, doc := range docContexts {
+		size += len(doc)
+	}
+
 	var promptBuilder strings.Builder
+	promptBuilder.Grow(size)
 
 	promptBuilder.WriteString("You are an expert Clarity programmer. ")
 	promptBuilder.WriteString("Use the provided Clarity code examples and documentation excerpts as context to answer the user's question.\n\n")
@@ -14,14 +32,22 @@ func buildCodeGenerationInstruction(query string, codeContexts, docContexts []st
 	if len(codeContexts) > 0 {
 		promptBuilder.WriteString("## Code Examples:\n\n")
 		for i, context := range codeContexts {
-			promptBuilder.WriteString(fmt.Sprintf("### Code Example %d:\n```clarity\n%s\n```\n\n", i+1, context))
+			promptBuilder.WriteString("### Code Example ")
+			promptBuilder.WriteString(strconv.Itoa(i + 1))
+			promptBuilder.WriteString(":\n```clarity\n")
+			promptBuilder.WriteString(context)
+			promptBuilder.WriteString("\n```\n\n")
 		}
 	}
 
 	if len(docContexts) > 0 {
 		promptBuilder.WriteString("## Documentation Excerpts:\n\n")
 		for i, doc := range docContexts {
-			promptBuilder.WriteString(fmt.Sprintf("### Doc Excerpt %d:\n```text\n%s\n```\n\n", i+1, doc))
+			promptBuilder.WriteString("### Doc Excerpt ")
+			promptBuilder.WriteString(strconv.Itoa(i + 1))
+			promptBuilder.WriteString(":\n```text\n")
+			promptBuilder.WriteString(doc)
+			promptBuilder.WriteString("\n```\n\n")
 		}
 	}
 
@@ -2,16 +2,18 @@ package codegen
 
 import "strings"
 
+const codeFence = "```"
+
 // extractCodeBlock extracts code from markdown code blocks.
 func extractCodeBlock(text, language string) string {
 	var startMarker, endMarker string
 
 	if language != "" {
-		startMarker = "```" + language
+		startMarker = codeFence + language
 	} else {
-		startMarker = "```"
+		startMarker = codeFence
 	}
-	endMarker = "```"
+	endMarker = codeFence
 
 	startIdx := strings.Index(text, startMarker)
 	if startIdx == -1 {
@@ -34,22 +36,26 @@ func extractCodeBlock(text, language string) string {
 
 // removeCodeBlocks removes all markdown code blocks from text.
 func removeCodeBlocks(text string) string {
-	result := text
+	var builder strings.Builder
+	builder.Grow(len(text))
 
+	rest := text
 	for {
-		startIdx := strings.Index(result, "```")
+		startIdx := strings.Index(rest, codeFence)
 		if startIdx == -1 {
 			break
 		}
 
-		endIdx := strings.Index(result[startIdx+3:], "```")
+		endIdx := strings.Index(rest[startIdx+len(codeFence):], codeFence)
 		if endIdx == -1 {
 			break
 		}
 
-		// Remove the code block
-		result = result[:startIdx] + result[startIdx+3+endIdx+3:]
+		// Keep the text before the block and skip past its closing fence
+		builder.WriteString(rest[:startIdx])
+		rest = rest[startIdx+len(codeFence)+endIdx+len(codeFence):]
 	}
+	builder.WriteString(rest)
 
-	return strings.TrimSpace(result)
+	return strings.TrimSpace(builder.String())
 }
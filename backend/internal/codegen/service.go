@@ -2,8 +2,10 @@ package codegen
 
 import (
 	"context"
+	"net/http"
 	"os"
 	"strings"
+	"time"
 )
 
 const (
@@ -12,6 +14,20 @@ const (
 	ProviderClaude = "claude"
 )
 
+// providerHTTPClient is shared by the provider SDK clients. The default
+// transport keeps only two idle connections per host, so concurrent requests
+// to the same API kept paying for new TCP and TLS handshakes.
+var providerHTTPClient = newProviderHTTPClient()
+
+func newProviderHTTPClient() *http.Client {
+	transport := http.DefaultTransport.(*http.Transport).Clone()
+	transport.MaxIdleConns = 100
+	transport.MaxIdleConnsPerHost = 16
+	transport.IdleConnTimeout = 90 * time.Second
+	transport.ForceAttemptHTTP2 = true
+	return &http.Client{Transport: transport}
+}
+
 // CodeGenerationResponse represents a code generation response
 type CodeGenerationResponse struct {
 	Code         string `json:"code"`
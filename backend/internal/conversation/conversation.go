@@ -22,6 +22,11 @@ type Conversation struct {
 	NewMessage string
 	CreatedAt  time.Time
 	UpdatedAt  time.Time
+
+	// historyJSON caches the serialised form of the first serializedTurns
+	// entries of History so saving only has to marshal newly added turns.
+	historyJSON     string
+	serializedTurns int
 }
 
 // New returns a conversation initialised for the supplied user.
@@ -41,12 +46,35 @@ func (c *Conversation) AddTurn(role, content string) {
 }
 
 // SerializeHistory marshals the conversation history to a JSON string.
+// Turns already serialised are reused, so only turns appended since the
+// last call are marshalled.
 func (c *Conversation) SerializeHistory() (string, error) {
+	if c.serializedTurns > 0 && c.serializedTurns <= len(c.History) {
+		if c.serializedTurns == len(c.History) {
+			return c.historyJSON, nil
+		}
+
+		cached := strings.TrimRight(c.historyJSON, " \t\r\n")
+		if strings.HasSuffix(cached, "]") {
+			delta, err := json.Marshal(c.History[c.serializedTurns:])
+			if err != nil {
+				return "", fmt.Errorf("marshal history: %w", err)
+			}
+
+			// Splice the new turns into the cached array: "[a,b" + "," + "c,d]"
+			c.historyJSON = cached[:len(cached)-1] + "," + string(delta[1:])
+			c.serializedTurns = len(c.History)
+			return c.historyJSON, nil
+		}
+	}
+
 	data, err := json.Marshal(c.History)
 	if err != nil {
 		return "", fmt.Errorf("marshal history: %w", err)
 	}
-	return string(data), nil
+	c.historyJSON = string(data)
+	c.serializedTurns = len(c.History)
+	return c.historyJSON, nil
 }
 
 // DeserializeHistory converts a JSON string into conversation turns.
@@ -5,15 +5,40 @@ import (
 	"database/sql"
 	"errors"
 	"fmt"
+	"sync"
 	"time"
 )
 
 // ErrConversationNotFound signals that the requested conversation does not exist.
 var ErrConversationNotFound = errors.New("conversation not found")
 
+const (
+	selectConversationSQL = `
+		SELECT id, user_id, history, COALESCE(new_message, ''), created_at, updated_at
+		FROM conversations
+		WHERE id = ? AND user_id = ?
+	`
+	insertConversationSQL = `
+		INSERT INTO conversations (user_id, history, new_message, created_at, updated_at)
+		VALUES (?, ?, ?, ?, ?)
+	`
+	updateConversationSQL = `
+		UPDATE conversations
+		SET history = ?, new_message = ?, updated_at = ?
+		WHERE id = ? AND user_id = ?
+	`
+)
+
 // Repository provides persistence for chat conversations.
+// It is safe for concurrent use and is meant to be shared across requests.
 type Repository struct {
 	db *sql.DB
+
+	prepareMu  sync.Mutex
+	prepared   bool
+	selectStmt *sql.Stmt
+	insertStmt *sql.Stmt
+	updateStmt *sql.Stmt
 }
 
 // NewRepository returns a repository backed by the supplied sql.DB handle.
@@ -21,20 +46,50 @@ func NewRepository(db *sql.DB) *Repository {
 	return &Repository{db: db}
 }
 
+// prepare compiles the repository's statements on first use so they are not
+// re-parsed for every request. A failure is not remembered; the next call
+// tries again, so a transient error such as SQLITE_BUSY does not stick.
+func (r *Repository) prepare() error {
+	r.prepareMu.Lock()
+	defer r.prepareMu.Unlock()
+
+	if r.prepared {
+		return nil
+	}
+
+	selectStmt, err := r.db.Prepare(selectConversationSQL)
+	if err != nil {
+		return fmt.Errorf("prepare select conversation: %w", err)
+	}
+	insertStmt, err := r.db.Prepare(insertConversationSQL)
+	if err != nil {
+		selectStmt.Close()
+		return fmt.Errorf("prepare insert conversation: %w", err)
+	}
+	updateStmt, err := r.db.Prepare(updateConversationSQL)
+	if err != nil {
+		selectStmt.Close()
+		insertStmt.Close()
+		return fmt.Errorf("prepare update conversation: %w", err)
+	}
+
+	r.selectStmt, r.insertStmt, r.updateStmt = selectStmt, insertStmt, updateStmt
+	r.prepared = true
+	return nil
+}
+
 // Get loads a conversation ensuring it belongs to the specified user.
 func (r *Repository) Get(ctx context.Context, id int64, userID int) (*Conversation, error) {
-	const query = `
-		SELECT id, user_id, history, COALESCE(new_message, ''), created_at, updated_at
-		FROM conversations
-		WHERE id = ? AND user_id = ?
-	`
+	if err := r.prepare(); err != nil {
+		return nil, err
+	}
 
 	var (
 		convo       Conversation
 		historyJSON string
 	)
 
-	err := r.db.QueryRowContext(ctx, query, id, userID).Scan(
+	err := r.selectStmt.QueryRowContext(ctx, id, userID).Scan(
 		&convo.ID,
 		&convo.UserID,
 		&historyJSON,
@@ -55,12 +110,18 @@ func (r *Repository) Get(ctx context.Context, id int64, userID int) (*Conversati
 		return nil, fmt.Errorf("parse history: %w", err)
 	}
 	convo.History = turns
+	convo.historyJSON = historyJSON
+	convo.serializedTurns = len(turns)
 
 	return &convo, nil
 }
 
 // Save inserts or updates the conversation record.
 func (r *Repository) Save(ctx context.Context, convo *Conversation) error {
+	if err := r.prepare(); err != nil {
+		return err
+	}
+
 	historyJSON, err := convo.SerializeHistory()
 	if err != nil {
 		return err
@@ -69,11 +130,7 @@ func (r *Repository) Save(ctx context.Context, convo *Conversation) error {
 	now := time.Now().UTC()
 
 	if convo.ID == 0 {
-		const insert = `
-			INSERT INTO conversations (user_id, history, new_message, created_at, updated_at)
-			VALUES (?, ?, ?, ?, ?)
-		`
-		res, err := r.db.ExecContext(ctx, insert, convo.UserID, historyJSON, convo.NewMessage, now, now)
+		res, err := r.insertStmt.ExecContext(ctx, convo.UserID, historyJSON, convo.NewMessage, now, now)
 		if err != nil {
 			return fmt.Errorf("insert conversation: %w", err)
 		}
@@ -88,12 +145,7 @@ func (r *Repository) Save(ctx context.Context, convo *Conversation) error {
 		return nil
 	}
 
-	const update = `
-		UPDATE conversations
-		SET history = ?, new_message = ?, updated_at = ?
-		WHERE id = ? AND user_id = ?
-	`
-	if _, err := r.db.ExecContext(ctx, update, historyJSON, convo.NewMessage, now, convo.ID, convo.UserID); err != nil {
+	if _, err := r.updateStmt.ExecContext(ctx, historyJSON, convo.NewMessage, now, convo.ID, convo.UserID); err != nil {
 		return fmt.Errorf("update conversation: %w", err)
 	}
 	convo.UpdatedAt = now
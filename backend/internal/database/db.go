@@ -5,10 +5,16 @@ import (
 	"fmt"
 	"os"
 	"strings"
+	"time"
 
 	_ "github.com/mattn/go-sqlite3"
 )
 
+const (
+	maxOpenConns    = 16
+	connMaxIdleTime = 5 * time.Minute
+)
+
 // InitDB initializes the database connection and runs migrations
 func InitDB() (*sql.DB, error) {
 	dbPath := os.Getenv("DATABASE_PATH")
@@ -22,11 +28,17 @@ func InitDB() (*sql.DB, error) {
 		return nil, fmt.Errorf("failed to create database directory: %w", err)
 	}
 
-	db, err := sql.Open("sqlite3", dbPath)
+	db, err := sql.Open("sqlite3", buildDSN(dbPath))
 	if err != nil {
 		return nil, err
 	}
 
+	// Keep a warm pool of connections so request handlers reuse them instead
+	// of reopening the database file and re-parsing the schema.
+	db.SetMaxOpenConns(maxOpenConns)
+	db.SetMaxIdleConns(maxOpenConns)
+	db.SetConnMaxIdleTime(connMaxIdleTime)
+
 	// Test connection
 	if err := db.Ping(); err != nil {
 		return nil, err
@@ -40,6 +52,17 @@ func InitDB() (*sql.DB, error) {
 	return db, nil
 }
 
+// buildDSN appends the connection pragmas applied to every pooled connection.
+// WAL lets readers proceed while a writer holds the lock, and NORMAL sync is
+// durable under WAL without an fsync per transaction.
+func buildDSN(dbPath string) string {
+	sep := "?"
+	if strings.Contains(dbPath, "?") {
+		sep = "&"
+	}
+	return dbPath + sep + "_journal_mode=WAL&_synchronous=NORMAL&_busy_timeout=5000"
+}
+
 // runMigrations creates the necessary database tables
 func runMigrations(db *sql.DB) error {
 	migrations := []string{
@@ -157,6 +180,18 @@ func runMigrations(db *sql.DB) error {
 		return err
 	}
 
+	// Lookup indexes; created after the backfill so legacy tables have every column.
+	indexes := []string{
+		`CREATE INDEX IF NOT EXISTS idx_api_keys_user_active ON api_keys(user_id, created_at) WHERE is_active = 1`,
+		`CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id)`,
+	}
+
+	for _, stmt := range indexes {
+		if _, err := db.Exec(stmt); err != nil {
+			return err
+		}
+	}
+
 	return nil
 }
 
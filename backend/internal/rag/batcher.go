@@ -0,0 +1,101 @@
+package rag
+
+import (
+	"context"
+	"sync"
+)
+
+const maxBatchSize = 16
+
+type batchResult struct {
+	response *RAGResponse
+	err      error
+}
+
+// pendingBatch collects queries that share an n_results value until it is dispatched.
+type pendingBatch struct {
+	queries []string
+	waiters []chan batchResult
+}
+
+// batcher groups concurrent retrievals so that a burst of requests is served by one
+// request to the Python retriever, which embeds all of its queries together.
+// A query that arrives while nothing is running is sent at once; queries that
+// arrive while a call is in flight wait for it to finish and are then sent
+// together.
+type batcher struct {
+	client  *PythonClient
+	maxSize int
+
+	mu       sync.Mutex
+	pending  map[int]*pendingBatch
+	inFlight int
+}
+
+func newBatcher(client *PythonClient, maxSize int) *batcher {
+	return &batcher{
+		client:  client,
+		maxSize: maxSize,
+		pending: make(map[int]*pendingBatch),
+	}
+}
+
+// retrieve queues the query and waits for the batch it joined to complete.
+func (b *batcher) retrieve(ctx context.Context, query string, nResults int) (*RAGResponse, error) {
+	result := make(chan batchResult, 1)
+
+	b.mu.Lock()
+	batch, ok := b.pending[nResults]
+	if !ok {
+		batch = &pendingBatch{}
+	}
+	batch.queries = append(batch.queries, query)
+	batch.waiters = append(batch.waiters, result)
+	switch {
+	case !ok && b.inFlight == 0:
+		// Nothing to wait behind; holding the query back would only add latency
+		b.start(nResults, batch)
+	case len(batch.queries) >= b.maxSize:
+		delete(b.pending, nResults)
+		b.start(nResults, batch)
+	case !ok:
+		// Sent by run when the call in flight finishes
+		b.pending[nResults] = batch
+	}
+	b.mu.Unlock()
+
+	select {
+	case res := <-result:
+		return res.response, res.err
+	case <-ctx.Done():
+		return nil, ctx.Err()
+	}
+}
+
+// start sends the batch on its own goroutine. b.mu must be held.
+func (b *batcher) start(nResults int, batch *pendingBatch) {
+	b.inFlight++
+	go b.run(nResults, batch)
+}
+
+func (b *batcher) run(nResults int, batch *pendingBatch) {
+	// The batch outlives any single caller, so it runs under the client timeout only.
+	responses, err := b.client.RetrieveBatch(context.Background(), batch.queries, nResults)
+
+	// Queries that queued up behind this call go out together now
+	b.mu.Lock()
+	b.inFlight--
+	for n, next := range b.pending {
+		delete(b.pending, n)
+		b.start(n, next)
+	}
+	b.mu.Unlock()
+
+	for i, waiter := range batch.waiters {
+		if err != nil {
+			waiter <- batchResult{err: err}
+			continue
+		}
+		waiter <- batchResult{response: &responses[i]}
+	}
+}
@@ -1,12 +1,15 @@
 package rag
 
 import (
+	"bufio"
 	"bytes"
 	"context"
 	"encoding/json"
 	"fmt"
+	"io"
 	"os"
 	"os/exec"
+	"sync"
 	"time"
 )
 
@@ -14,13 +17,33 @@ import (
 type PythonClient struct {
 	scriptPath string
 	timeout    time.Duration
+	// persistent keeps one retriever process running in --serve mode instead of
+	// starting a process (and loading the model) for every request.
+	persistent bool
+
+	mu     sync.Mutex
+	worker *pythonWorker
+}
+
+// pythonWorker is a retriever process started with --serve. It answers one JSON
+// request line with one JSON response line.
+type pythonWorker struct {
+	cmd    *exec.Cmd
+	stdin  io.WriteCloser
+	stdout *bufio.Reader
+}
+
+type workerReply struct {
+	line []byte
+	err  error
 }
 
 // RAGRequest represents the input to the Python script
 type RAGRequest struct {
-	Query       string `json:"query"`
-	NResults    int    `json:"n_results"`
-	DocsResults int    `json:"docs_results"`
+	Query       string   `json:"query,omitempty"`
+	Queries     []string `json:"queries,omitempty"`
+	NResults    int      `json:"n_results"`
+	DocsResults int      `json:"docs_results"`
 }
 
 // RAGResponse represents the output from the Python script
@@ -34,6 +57,12 @@ type RAGResponse struct {
 	Error            string    `json:"error,omitempty"`
 }
 
+// RAGBatchResponse represents the output from the Python script for a batch of queries
+type RAGBatchResponse struct {
+	Results []RAGResponse `json:"results"`
+	Error   string        `json:"error,omitempty"`
+}
+
 // NewPythonClient creates a new Python client for RAG operations
 func NewPythonClient(scriptPath string, timeout time.Duration) *PythonClient {
 	if scriptPath == "" {
@@ -46,6 +75,7 @@ func NewPythonClient(scriptPath string, timeout time.Duration) *PythonClient {
 	return &PythonClient{
 		scriptPath: scriptPath,
 		timeout:    timeout,
+		persistent: os.Getenv("RAG_PERSISTENT_WORKER") != "false",
 	}
 }
 
@@ -66,11 +96,165 @@ func (pc *PythonClient) Retrieve(ctx context.Context, query string, nResults int
 		DocsResults: nResults,
 	}
 
+	var response RAGResponse
+	if err := pc.run(ctx, request, &response); err != nil {
+		return nil, err
+	}
+
+	// Check for errors in response
+	if response.Error != "" {
+		return nil, fmt.Errorf("python script returned error: %s", response.Error)
+	}
+
+	return &response, nil
+}
+
+// RetrieveBatch retrieves contexts for several queries with a single request to the
+// Python retriever, so the queries are embedded together.
+// Results are returned in the order of queries.
+func (pc *PythonClient) RetrieveBatch(ctx context.Context, queries []string, nResults int) ([]RAGResponse, error) {
+	if len(queries) == 0 {
+		return nil, fmt.Errorf("queries cannot be empty")
+	}
+	if nResults < 1 || nResults > 10 {
+		nResults = 10
+	}
+
+	request := RAGRequest{
+		Queries:     queries,
+		NResults:    nResults,
+		DocsResults: nResults,
+	}
+
+	var response RAGBatchResponse
+	if err := pc.run(ctx, request, &response); err != nil {
+		return nil, err
+	}
+
+	if response.Error != "" {
+		return nil, fmt.Errorf("python script returned error: %s", response.Error)
+	}
+	if len(response.Results) != len(queries) {
+		return nil, fmt.Errorf("python script returned %d results for %d queries", len(response.Results), len(queries))
+	}
+
+	return response.Results, nil
+}
+
+// run sends the request to the Python retriever and decodes its response into out.
+func (pc *PythonClient) run(ctx context.Context, request RAGRequest, out interface{}) error {
 	requestJSON, err := json.Marshal(request)
 	if err != nil {
-		return nil, fmt.Errorf("failed to marshal request: %w", err)
+		return fmt.Errorf("failed to marshal request: %w", err)
 	}
 
+	if pc.persistent {
+		return pc.runWorker(ctx, requestJSON, out)
+	}
+	return pc.runOnce(ctx, requestJSON, out)
+}
+
+// runWorker sends the request to the long-lived retriever process, starting it if
+// needed. Requests are serialised; the batcher already merges concurrent ones.
+func (pc *PythonClient) runWorker(ctx context.Context, requestJSON []byte, out interface{}) error {
+	pc.mu.Lock()
+	defer pc.mu.Unlock()
+
+	// The timeout covers the exchange only, not the wait for the lock; a caller
+	// that gave up while queued leaves the worker untouched
+	execCtx, cancel := context.WithTimeout(ctx, pc.timeout)
+	defer cancel()
+	if err := execCtx.Err(); err != nil {
+		return fmt.Errorf("python worker error: %w", err)
+	}
+
+	for {
+		fresh := pc.worker == nil
+		if fresh {
+			worker, err := pc.startWorker()
+			if err != nil {
+				return err
+			}
+			pc.worker = worker
+		}
+
+		line, err := pc.worker.roundTrip(execCtx, requestJSON)
+		if err == nil {
+			if err := json.Unmarshal(line, out); err != nil {
+				// Stray output would shift every later reply by one line
+				pc.worker.stop()
+				pc.worker = nil
+				return fmt.Errorf("failed to parse python response: %w (output: %s)", err, line)
+			}
+			return nil
+		}
+
+		// The process state is unknown after a failed exchange, so replace it
+		pc.worker.stop()
+		pc.worker = nil
+
+		// A worker that died while idle gets one retry with a fresh process
+		if fresh || execCtx.Err() != nil {
+			return fmt.Errorf("python worker error: %w", err)
+		}
+	}
+}
+
+// startWorker starts the retriever in --serve mode. Its stderr goes to the server log.
+func (pc *PythonClient) startWorker() (*pythonWorker, error) {
+	cmd := exec.Command(pc.findPythonExecutable(), pc.scriptPath, "--serve")
+	cmd.Env = os.Environ()
+	cmd.Stderr = os.Stderr
+
+	stdin, err := cmd.StdinPipe()
+	if err != nil {
+		return nil, fmt.Errorf("failed to start python worker: %w", err)
+	}
+	stdout, err := cmd.StdoutPipe()
+	if err != nil {
+		return nil, fmt.Errorf("failed to start python worker: %w", err)
+	}
+	if err := cmd.Start(); err != nil {
+		return nil, fmt.Errorf("failed to start python worker: %w", err)
+	}
+
+	return &pythonWorker{
+		cmd:    cmd,
+		stdin:  stdin,
+		stdout: bufio.NewReaderSize(stdout, 64*1024),
+	}, nil
+}
+
+// roundTrip writes one request line and reads one response line, giving up when
+// ctx is done. The caller must stop the worker after an error.
+func (w *pythonWorker) roundTrip(ctx context.Context, requestJSON []byte) ([]byte, error) {
+	reply := make(chan workerReply, 1)
+	go func() {
+		if _, err := w.stdin.Write(append(requestJSON, '\n')); err != nil {
+			reply <- workerReply{err: err}
+			return
+		}
+		line, err := w.stdout.ReadBytes('\n')
+		reply <- workerReply{line: line, err: err}
+	}()
+
+	select {
+	case r := <-reply:
+		return r.line, r.err
+	case <-ctx.Done():
+		return nil, ctx.Err()
+	}
+}
+
+// stop kills the worker process and waits for it to exit.
+func (w *pythonWorker) stop() {
+	_ = w.stdin.Close()
+	_ = w.cmd.Process.Kill()
+	_ = w.cmd.Wait()
+}
+
+// runOnce executes the Python script with the request on stdin and decodes its stdout into out.
+func (pc *PythonClient) runOnce(ctx context.Context, requestJSON []byte, out interface{}) error {
 	// Create context with timeout
 	execCtx, cancel := context.WithTimeout(ctx, pc.timeout)
 	defer cancel()
@@ -91,29 +275,23 @@ func (pc *PythonClient) Retrieve(ctx context.Context, query string, nResults int
 	cmd.Env = os.Environ()
 
 	// Execute command
-	err = cmd.Run()
+	err := cmd.Run()
 
 	// Check for errors
 	if err != nil {
 		stderrStr := stderr.String()
 		if stderrStr != "" {
-			return nil, fmt.Errorf("python script error: %s (stderr: %s)", err, stderrStr)
+			return fmt.Errorf("python script error: %s (stderr: %s)", err, stderrStr)
 		}
-		return nil, fmt.Errorf("failed to execute python script: %w", err)
+		return fmt.Errorf("failed to execute python script: %w", err)
 	}
 
 	// Parse response
-	var response RAGResponse
-	if err := json.Unmarshal(stdout.Bytes(), &response); err != nil {
-		return nil, fmt.Errorf("failed to parse python response: %w (output: %s)", err, stdout.String())
+	if err := json.Unmarshal(stdout.Bytes(), out); err != nil {
+		return fmt.Errorf("failed to parse python response: %w (output: %s)", err, stdout.String())
 	}
 
-	// Check for errors in response
-	if response.Error != "" {
-		return nil, fmt.Errorf("python script returned error: %s", response.Error)
-	}
-
-	return &response, nil
+	return nil
 }
 
 // findPythonExecutable finds the Python executable to use
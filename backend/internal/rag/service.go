@@ -5,17 +5,28 @@ import (
 	"fmt"
 	"os"
 	"time"
+
+	"github.com/Quantum3-Labs/stacks-builder/backend/internal/cache"
+)
+
+const (
+	resultCacheSize = 1024
+	resultCacheTTL  = 10 * time.Minute
 )
 
 // Service provides RAG retrieval operations from ChromaDB
 type Service struct {
 	pythonClient *PythonClient
+	batcher      *batcher
+	results      *cache.TTL[RAGResponse]
 }
 
 // NewService creates a new RAG service
 func NewService(pythonClient *PythonClient) *Service {
 	return &Service{
 		pythonClient: pythonClient,
+		batcher:      newBatcher(pythonClient, maxBatchSize),
+		results:      cache.NewTTL[RAGResponse](resultCacheSize, resultCacheTTL),
 	}
 }
 
@@ -41,5 +52,25 @@ func (s *Service) RetrieveContext(ctx context.Context, query string, nResults in
 		return nil, fmt.Errorf("n_results must be between 1 and 20")
 	}
 
-	return s.pythonClient.Retrieve(ctx, query, nResults)
+	// Repeated queries skip the Python process (and its embedding pass) entirely.
+	// The TTL bounds how long results can lag behind a re-ingestion.
+	key := fmt.Sprintf("%d:%s", nResults, query)
+	if cached, ok := s.results.Get(key); ok {
+		return &cached, nil
+	}
+
+	if query == "" {
+		return nil, fmt.Errorf("query cannot be empty")
+	}
+
+	response, err := s.batcher.retrieve(ctx, query, nResults)
+	if err != nil {
+		return nil, err
+	}
+
+	// Partial results (e.g. docs collection not ingested yet) are not cached.
+	if response.Warning == "" {
+		s.results.Put(key, *response)
+	}
+	return response, nil
 }
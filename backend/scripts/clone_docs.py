@@ -8,11 +8,17 @@ Outputs newline-delimited JSON progress messages to stdout.
 
 import os
 import sys
+import errno
 import json
 import shutil
 import subprocess
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configuration
 DOC_REPO_URL = "https://github.com/clarity-lang/book.git"
 TEMP_CLONE_DIR = "temp_clarity_clone"
@@ -21,6 +27,54 @@ DOC_SOURCE_PATH = "src"
 # Get backend directory (1 level up from backend/scripts)
 BACKEND_DIR = Path(__file__).parent.parent
 TARGET_DIR = BACKEND_DIR / "data" / "clarity_official_docs"
+# Upstream commit the current docs were cloned from
+REVISION_FILE = TARGET_DIR / ".source_revision"
+
+
+def emit(message, flush=False):
+    """Write one NDJSON progress message to stdout.
+
+    Messages are buffered and only flushed at phase boundaries; the reader
+    still sees complete lines in order.
+    """
+    if orjson is not None:
+        line = orjson.dumps(message)
+    else:
+        line = json.dumps(message).encode()
+    sys.stdout.buffer.write(line + b"\n")
+    if flush:
+        sys.stdout.buffer.flush()
+
+
+def get_remote_revision():
+    """Return the upstream HEAD commit, or None if it cannot be determined"""
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", DOC_REPO_URL, "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+    except Exception:
+        return None
+    parts = result.stdout.split()
+    return parts[0] if parts else None
+
+
+def read_local_revision():
+    """Return the commit the existing docs were cloned from, if recorded"""
+    try:
+        return REVISION_FILE.read_text().strip() or None
+    except OSError:
+        return None
+
+
+def write_local_revision(revision):
+    """Record the cloned commit atomically"""
+    temp_path = REVISION_FILE.with_name(REVISION_FILE.name + ".tmp")
+    temp_path.write_text(revision)
+    os.replace(temp_path, REVISION_FILE)
 
 
 def count_doc_files(directory):
@@ -29,52 +83,68 @@ def count_doc_files(directory):
         return 0
 
     count = 0
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(('.md', '.mdx')):
-                count += 1
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(('.md', '.mdx')):
+                    count += 1
     return count
 
 
-def clone_documentation():
+def clone_documentation(force=False):
     """Clone Clarity documentation with progress reporting"""
     temp_clone_path = BACKEND_DIR / TEMP_CLONE_DIR
 
+    # Skip the clone entirely when upstream has not moved since the last run
+    remote_revision = get_remote_revision()
+    if not force and remote_revision and remote_revision == read_local_revision():
+        doc_count = count_doc_files(TARGET_DIR)
+        emit({
+            "type": "complete",
+            "total_processed": doc_count,
+            "skipped": True,
+            "message": f"Documentation already at {remote_revision[:12]}, skipping clone"
+        }, flush=True)
+        return
+
     # Report start
-    print(json.dumps({
+    emit({
         "type": "start",
         "total": 6,  # Number of steps
         "message": "Starting documentation clone"
-    }), flush=True)
+    }, flush=True)
 
     step = 0
 
     # Step 1: Clean up existing temp directory
     step += 1
-    print(json.dumps({
+    emit({
         "type": "progress",
         "current": step,
         "total": 6,
         "message": "Cleaning up temp directory"
-    }), flush=True)
+    })
 
     if temp_clone_path.exists():
         try:
             shutil.rmtree(temp_clone_path)
         except Exception as e:
-            print(json.dumps({
+            emit({
                 "type": "warning",
                 "message": f"Failed to remove temp directory: {str(e)}"
-            }), flush=True)
+            })
 
     # Step 2: Clean up existing docs directory
     step += 1
-    print(json.dumps({
+    emit({
         "type": "progress",
         "current": step,
         "total": 6,
         "message": "Cleaning up existing docs directory"
-    }), flush=True)
+    })
 
     if TARGET_DIR.exists():
         try:
@@ -88,16 +158,27 @@ def clone_documentation():
 
     # Step 3: Clone repository
     step += 1
-    print(json.dumps({
+    emit({
         "type": "progress",
         "current": step,
         "total": 6,
         "message": "Cloning Clarity repository"
-    }), flush=True)
+    })
 
     try:
+        # Blobless sparse clone: only the files under DOC_SOURCE_PATH are downloaded
+        subprocess.run(
+            [
+                "git", "clone", "--depth", "1", "--filter=blob:none", "--sparse",
+                DOC_REPO_URL, str(temp_clone_path)
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=120
+        )
         subprocess.run(
-            ["git", "clone", "--depth", "1", DOC_REPO_URL, str(temp_clone_path)],
+            ["git", "-C", str(temp_clone_path), "sparse-checkout", "set", DOC_SOURCE_PATH],
             check=True,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
@@ -124,12 +205,12 @@ def clone_documentation():
 
     # Step 4: Verify documentation path exists
     step += 1
-    print(json.dumps({
+    emit({
         "type": "progress",
         "current": step,
         "total": 6,
         "message": "Verifying documentation path"
-    }), flush=True)
+    })
 
     source_doc_path = temp_clone_path / DOC_SOURCE_PATH
     if not source_doc_path.exists():
@@ -144,19 +225,27 @@ def clone_documentation():
 
     # Step 5: Copy documentation
     step += 1
-    print(json.dumps({
+    emit({
         "type": "progress",
         "current": step,
         "total": 6,
-        "message": "Copying documentation files"
-    }), flush=True)
+        "message": "Moving documentation files"
+    })
 
     try:
-        shutil.copytree(source_doc_path, TARGET_DIR)
+        TARGET_DIR.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Same filesystem: a single rename instead of copying every file
+            os.replace(source_doc_path, TARGET_DIR)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # data/ is on another filesystem (e.g. a mounted volume): copy instead
+            shutil.move(str(source_doc_path), str(TARGET_DIR))
     except Exception as e:
         print(json.dumps({
             "type": "error",
-            "message": f"Failed to copy documentation: {str(e)}"
+            "message": f"Failed to move documentation: {str(e)}"
         }), file=sys.stderr)
         if temp_clone_path.exists():
             shutil.rmtree(temp_clone_path, ignore_errors=True)
@@ -165,54 +254,63 @@ def clone_documentation():
     # Remove old directory if it exists
     old_dir = TARGET_DIR / "old"
     if old_dir.exists():
-        print(json.dumps({
+        emit({
             "type": "info",
             "message": "Removing old documentation directory"
-        }), flush=True)
+        })
         try:
             shutil.rmtree(old_dir)
         except Exception as e:
-            print(json.dumps({
+            emit({
                 "type": "warning",
                 "message": f"Failed to remove old directory: {str(e)}"
-            }), flush=True)
+            })
+
+    if remote_revision:
+        try:
+            write_local_revision(remote_revision)
+        except OSError as e:
+            emit({
+                "type": "warning",
+                "message": f"Failed to record documentation revision: {str(e)}"
+            })
 
     # Count documentation files
     doc_count = count_doc_files(TARGET_DIR)
-    print(json.dumps({
+    emit({
         "type": "info",
-        "message": f"Copied {doc_count} documentation files"
-    }), flush=True)
+        "message": f"Moved {doc_count} documentation files"
+    })
 
     # Step 6: Clean up temp directory
     step += 1
-    print(json.dumps({
+    emit({
         "type": "progress",
         "current": step,
         "total": 6,
         "message": "Cleaning up temp files"
-    }), flush=True)
+    })
 
     try:
         if temp_clone_path.exists():
             shutil.rmtree(temp_clone_path)
     except Exception as e:
-        print(json.dumps({
+        emit({
             "type": "warning",
             "message": f"Failed to clean up temp directory: {str(e)}"
-        }), flush=True)
+        })
 
     # Report completion
-    print(json.dumps({
+    emit({
         "type": "complete",
         "total_processed": doc_count,
         "message": "Documentation cloning completed"
-    }), flush=True)
+    }, flush=True)
 
 
 if __name__ == "__main__":
     try:
-        clone_documentation()
+        clone_documentation(force="--force" in sys.argv[1:])
     except Exception as e:
         print(json.dumps({
             "type": "error",
@@ -8,12 +8,17 @@ Outputs newline-delimited JSON progress messages to stdout.
 
 import sys
 import json
+import shutil
 import subprocess
+import time
 from pathlib import Path
 
 # Get backend directory (1 level up from backend/scripts)
 BACKEND_DIR = Path(__file__).parent.parent
 TARGET_DIR = BACKEND_DIR / "data" / "clarity_code_samples"
+MAX_PARALLEL_CLONES = 4
+CLONE_TIMEOUT = 60  # Seconds per repository
+POLL_INTERVAL = 0.05  # Seconds between checks on running clones
 
 REPO_URLS = [
     "https://github.com/hirosystems/clarity-examples.git",
@@ -35,73 +40,117 @@ REPO_URLS = [
 ]
 
 
+def is_complete_clone(repo_path):
+    """Whether repo_path holds a clone whose HEAD resolves to a commit.
+
+    git clone creates .git/HEAD before fetching anything, so a clone killed
+    partway through still has one; only a fetched commit marks it complete.
+    """
+    if not (repo_path / ".git").exists():
+        return False
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "--verify", "-q", "HEAD"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    return result.returncode == 0
+
+
 def clone_repositories():
     """Clone all repositories with progress reporting"""
     # Ensure target directory exists
     TARGET_DIR.mkdir(parents=True, exist_ok=True)
 
-    total = len(REPO_URLS)
+    # The same repository listed twice would only be skipped, but still counted
+    repo_urls = list(dict.fromkeys(REPO_URLS))
+    total = len(repo_urls)
 
     # Report start
     print(json.dumps({"type": "start", "total": total}), flush=True)
 
-    cloned = 0
-    skipped = 0
-    failed = 0
+    counts = {"cloned": 0, "skipped": 0, "failed": 0}
+    processed = 0
+
+    def finish(repo_name, status, warning=None):
+        nonlocal processed
+        processed += 1
+        counts[status] += 1
 
-    for i, url in enumerate(REPO_URLS, 1):
-        repo_name = url.split("/")[-1].replace(".git", "")
-        repo_path = TARGET_DIR / repo_name
+        if warning:
+            print(json.dumps({
+                "type": "warning",
+                "message": warning
+            }), flush=True)
 
         # Report progress
         print(json.dumps({
             "type": "progress",
-            "current": i,
+            "current": processed,
             "total": total,
-            "message": f"Processing {repo_name}"
+            "message": f"Processed {repo_name}"
         }), flush=True)
 
-        # Skip if already exists
-        if repo_path.exists():
-            skipped += 1
+    # Clones are network-bound, so several git processes run at once. This
+    # single thread starts them and polls for completion; no thread blocks
+    # per clone.
+    pending = repo_urls
+    running = {}  # Popen -> (repo_name, repo_path, start time)
+
+    while pending or running:
+        while pending and len(running) < MAX_PARALLEL_CLONES:
+            url = pending.pop(0)
+            repo_name = url.split("/")[-1].replace(".git", "")
+            repo_path = TARGET_DIR / repo_name
+
+            # Skip complete clones; anything else at the path is a leftover
+            # of an interrupted clone, so it is removed and cloned again
+            if is_complete_clone(repo_path):
+                finish(repo_name, "skipped")
+                continue
+            if repo_path.exists():
+                shutil.rmtree(repo_path, ignore_errors=True)
+
+            try:
+                process = subprocess.Popen(
+                    ["git", "clone", "--depth", "1", url, str(repo_path)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL
+                )
+            except Exception as e:
+                finish(repo_name, "failed", f"Error cloning {repo_name}: {str(e)}")
+                continue
+            running[process] = (repo_name, repo_path, time.monotonic())
+
+        if not running:
             continue
 
-        # Try to clone
-        try:
-            subprocess.run(
-                ["git", "clone", "--depth", "1", url, str(repo_path)],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                timeout=60
-            )
-            cloned += 1
-        except subprocess.TimeoutExpired:
-            print(json.dumps({
-                "type": "warning",
-                "message": f"Timeout cloning {repo_name}"
-            }), flush=True)
-            failed += 1
-        except subprocess.CalledProcessError:
-            print(json.dumps({
-                "type": "warning",
-                "message": f"Failed to clone {repo_name}"
-            }), flush=True)
-            failed += 1
-        except Exception as e:
-            print(json.dumps({
-                "type": "warning",
-                "message": f"Error cloning {repo_name}: {str(e)}"
-            }), flush=True)
-            failed += 1
+        time.sleep(POLL_INTERVAL)
+
+        for process, (repo_name, repo_path, started) in list(running.items()):
+            returncode = process.poll()
+            if returncode is None:
+                if time.monotonic() - started > CLONE_TIMEOUT:
+                    process.kill()
+                    process.wait()
+                    del running[process]
+                    # Don't leave a partial checkout that the next run would skip
+                    shutil.rmtree(repo_path, ignore_errors=True)
+                    finish(repo_name, "failed", f"Timeout cloning {repo_name}")
+                continue
+
+            del running[process]
+            if returncode == 0:
+                finish(repo_name, "cloned")
+            else:
+                finish(repo_name, "failed", f"Failed to clone {repo_name}")
 
     # Report completion
     print(json.dumps({
         "type": "complete",
         "total_processed": total,
-        "cloned": cloned,
-        "skipped": skipped,
-        "failed": failed
+        "cloned": counts["cloned"],
+        "skipped": counts["skipped"],
+        "failed": counts["failed"]
     }), flush=True)
 
 
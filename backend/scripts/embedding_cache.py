@@ -0,0 +1,97 @@
+"""
+Persistent Embedding Cache
+
+Stores embedding vectors in a SQLite file next to the ChromaDB data, keyed by
+a SHA-256 of the embedding model name and the exact text that was embedded.
+Ingestion looks texts up here first and only runs the model for texts it has
+not seen, so re-ingesting unchanged chunks costs a database lookup instead of
+a forward pass. Retrieval opens the cache read-only.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+CACHE_NAME = ".embedding_cache.sqlite3"
+LOOKUP_BATCH_SIZE = 500  # Keys per SELECT, below SQLite's bound parameter limit
+
+
+def text_hash(model_name: str, text: str) -> bytes:
+    """Cache key for a text embedded with the given model"""
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """SQLite-backed map from text hash to float32 embedding vector"""
+
+    def __init__(self, path: Path, read_only: bool = False):
+        if read_only:
+            # Lookups only: no schema setup, and nothing is ever written
+            self._conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, timeout=5)
+            return
+
+        # The retriever reads while an ingestion run may be writing; WAL lets
+        # readers proceed and the timeout covers short write locks
+        self._conn = sqlite3.connect(str(path), timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS emb (h BLOB PRIMARY KEY, v BLOB) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return the cached vectors for the hashes that are present"""
+        found = {}
+        for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT h, v FROM emb WHERE h IN ({placeholders})", batch
+            )
+            for key, value in rows:
+                found[key] = np.frombuffer(value, dtype=np.float32)
+        return found
+
+    def put_many(self, hash_vec_pairs: Iterable[Tuple[bytes, np.ndarray]]):
+        """Store vectors, replacing any existing entries with the same hash"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO emb (h, v) VALUES (?, ?)",
+                (
+                    (key, np.asarray(vector, dtype=np.float32).tobytes())
+                    for key, vector in hash_vec_pairs
+                )
+            )
+
+    def embed(
+        self,
+        model_name: str,
+        texts: List[str],
+        encode: Callable[[List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """Embed texts, calling encode only for those missing from the cache.
+
+        Returns a float32 array with one row per text, in input order.
+        """
+        keys = [text_hash(model_name, text) for text in texts]
+        vectors = self.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        if missing:
+            encoded = np.asarray(encode(list(missing.values())), dtype=np.float32)
+            new_vectors = dict(zip(missing.keys(), encoded))
+            self.put_many(new_vectors.items())
+            vectors.update(new_vectors)
+
+        return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+
+    def close(self):
+        self._conn.close()
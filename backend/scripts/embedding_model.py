@@ -0,0 +1,53 @@
+"""
+Embedding Model Selection
+
+Ingestion and retrieval load the embedding model from here, so the vectors
+stored in ChromaDB and the query vectors compared against them always come
+from the same model with the same settings.
+"""
+
+import os
+from typing import Any, Optional
+
+from sentence_transformers import SentenceTransformer
+
+
+SENTENCE_TRANSFORMER_MODEL = "all-MiniLM-L6-v2"
+# Static embedding model used when EMBEDDING_BACKEND=model2vec
+MODEL2VEC_MODEL = "minishlab/potion-base-8M"
+
+_MODEL: Optional[Any] = None
+
+
+def embedding_model_name() -> str:
+    """Name of the embedding model selected by EMBEDDING_BACKEND"""
+    if os.getenv("EMBEDDING_BACKEND", "").lower() == "model2vec":
+        return MODEL2VEC_MODEL
+    return SENTENCE_TRANSFORMER_MODEL
+
+
+def embedding_model_loaded() -> bool:
+    """Whether get_embedding_model has already loaded the model in this process"""
+    return _MODEL is not None
+
+
+def get_embedding_model() -> Any:
+    """Load the embedding model on first use and return the cached instance.
+
+    Raises ImportError when EMBEDDING_BACKEND=model2vec and the model2vec
+    package is not installed.
+    """
+    global _MODEL
+    if _MODEL is None:
+        model_name = embedding_model_name()
+        if model_name == MODEL2VEC_MODEL:
+            from model2vec import StaticModel
+
+            _MODEL = StaticModel.from_pretrained(model_name)
+        else:
+            _MODEL = SentenceTransformer(model_name)
+            if _MODEL.device.type == "cuda":
+                # Half precision halves weight and activation traffic on the GPU;
+                # the vectors differ from FP32 only in the last few bits
+                _MODEL.half()
+    return _MODEL
@@ -0,0 +1,210 @@
+"""
+Shared Ingestion Helpers
+
+Used by ingest_docs.py and ingest_samples.py: walking the cloned sources,
+the manifest that lets unchanged files be skipped, and embedding and writing
+batches to ChromaDB. Progress and errors are reported as newline-delimited
+JSON, like the rest of the ingestion output.
+"""
+
+import os
+import sys
+import json
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from embedding_cache import CACHE_NAME, EmbeddingCache
+from embedding_model import embedding_model_loaded, embedding_model_name, get_embedding_model
+
+
+# Directories that never hold ingestible files; git metadata is most of a clone
+SKIP_DIRS = frozenset((".git", ".github", "node_modules"))
+EMBEDDING_BATCH_SIZE = 128  # Texts per encoder forward pass
+STORE_BATCH_SIZE = 1000  # Documents embedded and added to ChromaDB at a time
+
+_EMBEDDING_CACHE = None
+
+
+def get_chromadb_path() -> str:
+    """Get ChromaDB path from environment or use backend default"""
+    chromadb_path = os.getenv("CHROMADB_PATH")
+    if chromadb_path:
+        return chromadb_path
+    return str(Path(__file__).parent.parent / "data" / "chromadb")
+
+
+def load_embedding_model():
+    """Return the shared embedding model, reporting when it has to be loaded"""
+    if not embedding_model_loaded():
+        print(json.dumps({"type": "info", "message": "Loading embedding model..."}), flush=True)
+    try:
+        return get_embedding_model()
+    except ImportError as e:
+        print(json.dumps({
+            "type": "error",
+            "message": f"EMBEDDING_BACKEND=model2vec requires the model2vec package: {str(e)}"
+        }), file=sys.stderr)
+        sys.exit(1)
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Open the persistent embedding cache on first use; None if it is unavailable"""
+    global _EMBEDDING_CACHE
+    if _EMBEDDING_CACHE is None:
+        try:
+            _EMBEDDING_CACHE = EmbeddingCache(Path(get_chromadb_path()) / CACHE_NAME)
+        except sqlite3.Error as e:
+            print(json.dumps({
+                "type": "warning",
+                "message": f"Embedding cache unavailable, embedding every text: {str(e)}"
+            }), flush=True)
+            _EMBEDDING_CACHE = False
+    return _EMBEDDING_CACHE or None
+
+
+def load_manifest(path: Path) -> Optional[Dict]:
+    """Load the ingest manifest, or None if there is no usable one"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("files"), dict):
+        return None
+    return manifest
+
+
+def save_manifest(path: Path, manifest: Dict):
+    """Write the ingest manifest atomically"""
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, path)
+
+
+def iter_files(directory: str) -> Iterator[os.DirEntry]:
+    """Yield a DirEntry for every file below directory, without following symlinked
+    directories or descending into SKIP_DIRS"""
+    pending = [directory]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        pending.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+
+
+def get_embeddings(model, texts: List[str]) -> np.ndarray:
+    """Generate embeddings for all texts in padded mini-batches.
+
+    Identical texts (repeated boilerplate across pages) are encoded once.
+    Texts are encoded shortest-first so each batch holds similarly sized
+    inputs and little work is spent on padding; results are returned in the
+    original order. The result stays a float32 array, which ChromaDB accepts
+    directly and which is far smaller than nested lists of Python floats.
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    order = np.argsort([len(text) for text in unique_texts], kind="stable")
+    encoded = model.encode(
+        [unique_texts[i] for i in order],
+        batch_size=EMBEDDING_BATCH_SIZE,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    )
+
+    embeddings = np.empty_like(encoded, dtype=np.float32)
+    embeddings[order] = encoded
+    if len(unique_texts) == len(texts):
+        return embeddings
+
+    position = {text: i for i, text in enumerate(unique_texts)}
+    return embeddings[[position[text] for text in texts]]
+
+
+def start_writer(collection):
+    """Add embedded batches to the collection on a background thread.
+
+    Writing to ChromaDB then overlaps with embedding the next batch. Returns
+    (submit, finish): submit queues a batch, finish waits until every queued
+    batch has been written.
+    """
+    pending = queue.Queue(maxsize=2)
+    errors = []
+
+    def write():
+        while True:
+            batch = pending.get()
+            if batch is None:
+                return
+            if errors:
+                continue  # Keep draining so submit never blocks forever
+            docs, embeddings, metadatas, ids, stale_ids = batch
+            try:
+                # Drop outdated documents, then write new ones. Upsert keeps a
+                # re-run that overlaps an earlier partial one idempotent.
+                if stale_ids:
+                    collection.delete(ids=stale_ids)
+                if docs:
+                    collection.upsert(
+                        documents=docs,
+                        embeddings=embeddings,
+                        metadatas=metadatas,
+                        ids=ids
+                    )
+            except Exception as e:
+                errors.append(e)
+
+    def check():
+        if errors:
+            print(json.dumps({
+                "type": "error",
+                "message": f"Failed to store in ChromaDB: {str(errors[0])}"
+            }), file=sys.stderr)
+            sys.exit(1)
+
+    def submit(docs, embeddings, metadatas, ids, stale_ids):
+        check()
+        pending.put((docs, embeddings, metadatas, ids, stale_ids))
+
+    def finish():
+        pending.put(None)
+        thread.join()
+        check()
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return submit, finish
+
+
+def store_batch(submit, docs, texts, metadatas, ids, stale_ids, unit="documents"):
+    """Embed texts for a batch of documents and queue the batch for writing to
+    ChromaDB, together with the ids of outdated documents to delete first.
+
+    Callers flush every STORE_BATCH_SIZE documents, so the whole corpus is
+    never held in memory at once.
+    """
+    embeddings = None
+    if docs:
+        print(json.dumps({
+            "type": "info",
+            "message": f"Storing {len(docs)} {unit} in ChromaDB..."
+        }), flush=True)
+        # Texts embedded by an earlier run come from the cache; the model is
+        # only loaded and run for the rest
+        cache = get_embedding_cache()
+        if cache is not None:
+            embeddings = cache.embed(
+                embedding_model_name(),
+                texts,
+                lambda missing: get_embeddings(load_embedding_model(), missing)
+            )
+        else:
+            embeddings = get_embeddings(load_embedding_model(), texts)
+    submit(docs, embeddings, metadatas, ids, stale_ids)
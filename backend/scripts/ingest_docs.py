@@ -9,82 +9,172 @@ Outputs newline-delimited JSON progress messages to stdout.
 import os
 import sys
 import json
+import hashlib
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 # Disable ChromaDB telemetry to avoid version compatibility issues
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 
 try:
-    from sentence_transformers import SentenceTransformer
     import chromadb
+    from embedding_model import MODEL2VEC_MODEL, embedding_model_loaded, embedding_model_name
+    from ingest_common import (
+        STORE_BATCH_SIZE,
+        get_chromadb_path,
+        iter_files,
+        load_embedding_model,
+        load_manifest,
+        save_manifest,
+        start_writer,
+        store_batch,
+    )
 except ImportError as e:
     error_msg = {"type": "error", "message": f"Missing packages: {str(e)}"}
     print(json.dumps(error_msg), file=sys.stderr)
     sys.exit(1)
 
+# PyYAML comes with chromadb; its libyaml-backed loader is used when available
+try:
+    import yaml
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    yaml = None
+
 
 # Get paths
 BACKEND_DIR = Path(__file__).parent.parent
 DOCS_DIR = BACKEND_DIR / "data" / "clarity_official_docs"
+# Chunk size limits in embedding model tokens; MiniLM truncates its input at 256
+CHUNK_MAX_TOKENS = 200
+CHUNK_MIN_TOKENS = 100
+CHUNK_OVERLAP_TOKENS = 20
+# Boundaries tried in order when a chunk is too long
+CHUNK_SEPARATORS = ("\n\n", "\n", ". ", " ")
+CHUNK_WORKERS = os.cpu_count() or 1  # Processes used to read and chunk files
+# Records the ingested files so unchanged ones are skipped on the next run
+MANIFEST_NAME = ".clarity_docs_manifest.json"
+
+# Bump when the embedded text or stored metadata changes, so old collections are rebuilt
+MANIFEST_VERSION = 4
+
+_TOKENIZER = None
+
+# "---" at the very start, up to the next "---"; group 2 is the remaining document
+FRONTMATTER_RE = re.compile(r'---(.*?)---(.*)', re.S)
+# One "key: value" line of frontmatter, split at the first colon
+FRONTMATTER_FIELD_RE = re.compile(r'^([^:\n]*):(.*)$', re.M)
+# Any line whose first non-blank character is "#"
+HEADER_LINE_RE = re.compile(r'^[^\S\n]*#.*$', re.M)
+# Line break; its matches give the offset of every line start
+NEWLINE_RE = re.compile(r'\n')
+# A "###" to "######" heading on its own line inside a section
+SUBSECTION_RE = re.compile(r'\n(#{3,6}[^\n]+)\n')
+# Markers used by classify_section; only the code fence is case-sensitive
+SECTION_MARKER_RE = re.compile(r'(?-i:```clarity)|\(define-|example|tutorial|install|setup|error|warning', re.I)
+# Section type for each marker, earlier types take precedence
+SECTION_MARKER_TYPES = {
+    '```clarity': 'api_reference',
+    '(define-': 'api_reference',
+    'example': 'tutorial',
+    'tutorial': 'tutorial',
+    'install': 'setup',
+    'setup': 'setup',
+    'error': 'troubleshooting',
+    'warning': 'troubleshooting',
+}
+SECTION_TYPE_PRIORITY = ('api_reference', 'tutorial', 'setup', 'troubleshooting')
+
+
+def get_chunk_id(rel_path: str, text: str, metadata: Dict) -> str:
+    """Deterministic chunk id derived from everything that is stored for it,
+    so an unchanged chunk keeps its id across runs and edits to its file."""
+    key = json.dumps([rel_path, text, metadata], sort_keys=True)
+    return "clarity_docs_" + hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def contextualize_chunk(chunk: Dict) -> str:
+    """Text embedded for a chunk: its section breadcrumb followed by the content.
+    The stored document stays the bare content."""
+    breadcrumb = " > ".join(part for part in (chunk['parent_context'], chunk['title']) if part)
+    if not breadcrumb:
+        return chunk['content']
+    return f"{breadcrumb}\n\n{chunk['content']}"
+
+
+def parse_simple_frontmatter(block: str) -> Dict:
+    """Read frontmatter as flat "key: value" lines, for when it is not valid YAML."""
+    frontmatter = {}
+    for field in FRONTMATTER_FIELD_RE.finditer(block):
+        key = field.group(1).strip()
+        value = field.group(2).strip().strip('"\'')
+        if key == 'sidebar_position':
+            try:
+                frontmatter[key] = int(value)
+            except ValueError:
+                frontmatter[key] = value
+        else:
+            frontmatter[key] = value
+    return frontmatter
 
 
-def get_chromadb_path():
-    """Get ChromaDB path from environment or use backend default"""
-    chromadb_path = os.getenv("CHROMADB_PATH")
-    if chromadb_path:
-        return chromadb_path
-    return str(Path(__file__).parent.parent / "data" / "chromadb")
-
+def parse_yaml_frontmatter(block: str) -> Optional[Dict]:
+    """Parse frontmatter as YAML, or None if PyYAML is missing or the block is
+    not a YAML mapping. Values ChromaDB metadata cannot hold are flattened."""
+    if yaml is None:
+        return None
+    try:
+        data = yaml.load(block, Loader=YAML_LOADER)
+    except yaml.YAMLError:
+        return None
+    if not isinstance(data, dict):
+        return None
 
-def get_embedding(model, text: str) -> list:
-    """Generate embedding for text"""
-    return model.encode(text).tolist()
+    frontmatter = {}
+    for key, value in data.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, dict)):
+            value = json.dumps(value, default=str)
+        elif not isinstance(value, (str, int, float, bool)):
+            value = str(value)  # Dates and timestamps
+        frontmatter[str(key)] = value
+    return frontmatter
 
 
 def extract_frontmatter(content: str) -> Tuple[Dict, str]:
     """Extract YAML frontmatter and return metadata and content."""
     frontmatter = {}
-    if content.startswith('---'):
-        try:
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter_text = parts[1].strip()
-                content = parts[2].strip()
-                # Simple YAML parsing for common fields
-                for line in frontmatter_text.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"\'')
-                        if key == 'sidebar_position':
-                            try:
-                                frontmatter[key] = int(value)
-                            except:
-                                frontmatter[key] = value
-                        else:
-                            frontmatter[key] = value
-        except:
-            pass
+    match = FRONTMATTER_RE.match(content)
+    if match:
+        content = match.group(2).strip()
+        frontmatter = parse_yaml_frontmatter(match.group(1))
+        if frontmatter is None:
+            frontmatter = parse_simple_frontmatter(match.group(1))
     return frontmatter, content
 
 
 def parse_headers(content: str) -> List[Dict]:
     """Parse markdown headers and return hierarchy information."""
     headers = []
-    lines = content.split('\n')
-
-    for i, line in enumerate(lines):
-        if line.strip().startswith('#'):
-            level = len(line) - len(line.lstrip('#'))
-            if level <= 4:  # Only consider up to h4
-                title = line.strip('#').strip()
-                headers.append({
-                    'level': level,
-                    'title': title,
-                    'line_number': i
-                })
+    line_number = 0
+    position = 0
+
+    for match in HEADER_LINE_RE.finditer(content):
+        line_number += content.count('\n', position, match.start())
+        position = match.start()
+
+        line = match.group(0)
+        level = len(line) - len(line.lstrip('#'))
+        if level <= 4:  # Only consider up to h4
+            title = line.strip('#').strip()
+            headers.append({
+                'level': level,
+                'title': title,
+                'line_number': line_number
+            })
     return headers
 
 
@@ -109,94 +199,179 @@ def get_parent_context(headers: List[Dict], current_index: int) -> str:
 
 def classify_section(content: str) -> str:
     """Classify section type based on content patterns."""
-    content_lower = content.lower()
-
-    if '```clarity' in content or '(define-' in content_lower:
-        return 'api_reference'
-    elif 'example' in content_lower or 'tutorial' in content_lower:
-        return 'tutorial'
-    elif 'install' in content_lower or 'setup' in content_lower:
-        return 'setup'
-    elif 'error' in content_lower or 'warning' in content_lower:
-        return 'troubleshooting'
-    else:
-        return 'documentation'
+    # One case-insensitive scan over the section instead of lowercasing a copy
+    # and searching it once per marker; stops at the first API marker
+    best = len(SECTION_TYPE_PRIORITY)
+    for match in SECTION_MARKER_RE.finditer(content):
+        rank = SECTION_TYPE_PRIORITY.index(SECTION_MARKER_TYPES[match.group().lower()])
+        if rank < best:
+            best = rank
+            if best == 0:
+                break
 
+    return SECTION_TYPE_PRIORITY[best] if best < len(SECTION_TYPE_PRIORITY) else 'documentation'
 
-def split_by_paragraphs(content: str, title: str, parent_context: str, section_type: str) -> List[Dict]:
-    """Split content by paragraphs when no other structure is available."""
-    chunks = []
-    paragraphs = content.split('\n\n')
-    current_chunk = ""
 
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
+def get_tokenizer():
+    """Return the embedding model's tokenizer, loading only the tokenizer when
+    the model itself is not needed in this process (e.g. chunking workers)."""
+    global _TOKENIZER
+    if _TOKENIZER is not None:
+        return _TOKENIZER
+
+    model_name = embedding_model_name()
+    if embedding_model_loaded() or model_name == MODEL2VEC_MODEL:
+        # Static models are small enough to load whole
+        _TOKENIZER = load_embedding_model().tokenizer
+    else:
+        from transformers import AutoTokenizer
+
+        _TOKENIZER = AutoTokenizer.from_pretrained(f"sentence-transformers/{model_name}")
+    return _TOKENIZER
+
+
+def count_tokens(text: str) -> int:
+    """Number of embedding model tokens in text, not counting special tokens."""
+    encoded = get_tokenizer().encode(text, add_special_tokens=False)
+    # sentence-transformers returns a list of ids, model2vec an Encoding
+    return len(getattr(encoded, "ids", encoded))
+
+
+def trim_piece(text: str) -> str:
+    """Drop surrounding blank lines and trailing whitespace, keeping the
+    indentation of the first line."""
+    return text.lstrip("\n").rstrip()
+
+
+def split_text(text: str, separators: Tuple[str, ...] = CHUNK_SEPARATORS) -> List[str]:
+    """Recursively split text into pieces of at most CHUNK_MAX_TOKENS tokens.
+
+    The coarsest separator that yields small enough pieces is used, and each
+    piece starts with up to CHUNK_OVERLAP_TOKENS tokens from the end of the
+    previous one. Parts keep their separator, so a piece is an exact slice of
+    the text and code indentation, blank lines and full stops survive.
+    """
+    text = trim_piece(text)
+    if not text:
+        return []
+    if not separators or count_tokens(text) <= CHUNK_MAX_TOKENS:
+        return [text]
+
+    separator, finer = separators[0], separators[1:]
+    parts = [part for part in re.split(f"(?<={re.escape(separator)})", text) if part]
+    if len(parts) == 1:
+        return split_text(text, finer)
+
+    pieces = []
+    # (part, token count) pairs of the piece being built and its token total
+    current = []
+    current_tokens = 0
+
+    def flush():
+        piece = trim_piece("".join(p for p, _ in current))
+        if piece:
+            pieces.append(piece)
+
+    for part in parts:
+        part_tokens = count_tokens(part)
+        if part_tokens > CHUNK_MAX_TOKENS:
+            if current:
+                flush()
+                current, current_tokens = [], 0
+            pieces.extend(split_text(part, finer))
             continue
 
-        # Check if adding this paragraph would exceed limit
-        if len(current_chunk + para) > 1500 and current_chunk:
-            chunks.append({
-                'content': current_chunk.strip(),
-                'title': title,
-                'parent_context': parent_context,
-                'section_type': section_type,
-                'headers': []
-            })
-            current_chunk = para
-        else:
-            current_chunk += ("\n\n" if current_chunk else "") + para
+        if current and current_tokens + part_tokens > CHUNK_MAX_TOKENS:
+            flush()
+            # Carry the tail of the previous piece over as overlap
+            overlap = []
+            overlap_tokens = 0
+            for previous, previous_tokens in reversed(current):
+                if overlap_tokens + previous_tokens > CHUNK_OVERLAP_TOKENS:
+                    break
+                overlap.insert(0, (previous, previous_tokens))
+                overlap_tokens += previous_tokens
+            if overlap_tokens + part_tokens > CHUNK_MAX_TOKENS:
+                overlap, overlap_tokens = [], 0
+            current, current_tokens = overlap, overlap_tokens
+
+        current_tokens += part_tokens
+        current.append((part, part_tokens))
+
+    if current:
+        flush()
+    return pieces
+
+
+def merge_small_pieces(pieces: List[str]) -> List[str]:
+    """Merge pieces under CHUNK_MIN_TOKENS into the previous piece when they fit."""
+    merged = []
+    merged_tokens = []
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if merged and (tokens < CHUNK_MIN_TOKENS or merged_tokens[-1] < CHUNK_MIN_TOKENS):
+            combined = f"{merged[-1]}\n\n{piece}"
+            combined_tokens = count_tokens(combined)
+            if combined_tokens <= CHUNK_MAX_TOKENS:
+                merged[-1] = combined
+                merged_tokens[-1] = combined_tokens
+                continue
+        merged.append(piece)
+        merged_tokens.append(tokens)
+    return merged
 
-    # Add remaining content
-    if current_chunk.strip():
-        chunks.append({
-            'content': current_chunk.strip(),
+
+def split_by_paragraphs(content: str, title: str, parent_context: str, section_type: str) -> List[Dict]:
+    """Split content into token-bounded chunks, preferring paragraph, then line,
+    sentence and word boundaries."""
+    return [
+        {
+            'content': piece,
             'title': title,
             'parent_context': parent_context,
             'section_type': section_type,
             'headers': []
-        })
-
-    return chunks
+        }
+        for piece in merge_small_pieces(split_text(content))
+    ]
 
 
 def split_large_section(content: str, title: str, parent_context: str, section_type: str) -> List[Dict]:
     """Split large sections into smaller chunks while preserving meaning."""
-    chunks = []
-
-    # Try to split on subheadings first
-    subsection_pattern = r'\n(#{3,6}[^\n]+)\n'
-    parts = re.split(subsection_pattern, content)
-
-    if len(parts) > 1:
-        # Has subsections
-        current_chunk = parts[0]  # Content before first subsection
-
-        for i in range(1, len(parts), 2):
-            if i + 1 < len(parts):
-                subsection_title = parts[i].strip('#').strip()
-                subsection_content = parts[i + 1]
-
-                chunk_content = f"{parts[i]}\n{subsection_content}"
-                if len(current_chunk.strip()) > 0:
-                    chunk_content = current_chunk + "\n" + chunk_content
-
-                if len(chunk_content) > 2500:  # Still too large
-                    # Split by paragraphs
-                    para_chunks = split_by_paragraphs(chunk_content, f"{title} - {subsection_title}", parent_context, section_type)
-                    chunks.extend(para_chunks)
-                else:
-                    chunks.append({
-                        'content': chunk_content.strip(),
-                        'title': f"{title} - {subsection_title}",
-                        'parent_context': parent_context,
-                        'section_type': section_type,
-                        'headers': []
-                    })
-                current_chunk = ""
-    else:
+    # Try to split on subheadings first, walking the matches instead of
+    # materializing every heading and body with re.split
+    matches = SUBSECTION_RE.finditer(content)
+    match = next(matches, None)
+    if match is None:
         # No subsections, split by paragraphs
-        chunks = split_by_paragraphs(content, title, parent_context, section_type)
+        return split_by_paragraphs(content, title, parent_context, section_type)
+
+    chunks = []
+    current_chunk = content[:match.start()]  # Content before first subsection
+    while match is not None:
+        following = next(matches, None)
+        heading = match.group(1)
+        subsection_title = heading.strip('#').strip()
+        subsection_content = content[match.end():following.start() if following else len(content)]
+
+        chunk_content = f"{heading}\n{subsection_content}"
+        if len(current_chunk.strip()) > 0:
+            chunk_content = current_chunk + "\n" + chunk_content
+
+        if count_tokens(chunk_content) > CHUNK_MAX_TOKENS:  # Still too large
+            # Split by paragraphs
+            para_chunks = split_by_paragraphs(chunk_content, f"{title} - {subsection_title}", parent_context, section_type)
+            chunks.extend(para_chunks)
+        else:
+            chunks.append({
+                'content': chunk_content.strip(),
+                'title': f"{title} - {subsection_title}",
+                'parent_context': parent_context,
+                'section_type': section_type,
+                'headers': []
+            })
+        current_chunk = ""
+        match = following
 
     return chunks
 
@@ -204,34 +379,32 @@ def split_large_section(content: str, title: str, parent_context: str, section_t
 def chunk_content(content: str, headers: List[Dict], file_path: str, frontmatter: Dict) -> List[Dict]:
     """Chunk content based on headers while preserving context."""
     chunks = []
-    lines = content.split('\n')
+    # Offset of the start of each line, plus one past the end of the content;
+    # sections are sliced straight out of the content with these
+    line_offsets = [0]
+    line_offsets.extend(match.end() for match in NEWLINE_RE.finditer(content))
+    line_offsets.append(len(content) + 1)
+    line_count = len(line_offsets) - 1
 
     if not headers:
         # No headers found, treat as single chunk
         chunk_content = content.strip()
         if chunk_content:
-            chunks.append({
-                'content': chunk_content,
-                'title': os.path.basename(file_path),
-                'parent_context': '',
-                'section_type': 'document',
-                'headers': []
-            })
+            chunks.extend(split_by_paragraphs(chunk_content, os.path.basename(file_path), '', 'document'))
         return chunks
 
     for i, header in enumerate(headers):
         start_line = header['line_number']
 
         # Find end line (next header of same or higher level)
-        end_line = len(lines)
+        end_line = line_count
         for j in range(i + 1, len(headers)):
             if headers[j]['level'] <= header['level']:
                 end_line = headers[j]['line_number']
                 break
 
         # Extract section content
-        section_lines = lines[start_line:end_line]
-        section_content = '\n'.join(section_lines).strip()
+        section_content = content[line_offsets[start_line]:line_offsets[end_line] - 1].strip()
 
         if not section_content or len(section_content) < 50:
             continue
@@ -243,7 +416,7 @@ def chunk_content(content: str, headers: List[Dict], file_path: str, frontmatter
         section_type = classify_section(section_content)
 
         # Split large sections if needed
-        if len(section_content) > 2000:  # Roughly 400-500 tokens
+        if count_tokens(section_content) > CHUNK_MAX_TOKENS:
             sub_chunks = split_large_section(section_content, header['title'], parent_context, section_type)
             chunks.extend(sub_chunks)
         else:
@@ -290,13 +463,72 @@ def get_file_metadata(file_path: str, base_dir: Path, frontmatter: Dict) -> Dict
 
 def find_doc_files(docs_dir: Path) -> List[str]:
     """Find all markdown documentation files."""
-    doc_files = []
-    for root, _, files in os.walk(docs_dir):
-        for file in files:
-            if file.endswith(('.md', '.mdx')):
-                file_path = os.path.join(root, file)
-                doc_files.append(file_path)
-    return doc_files
+    return [
+        entry.path
+        for entry in iter_files(str(docs_dir))
+        if entry.name.endswith(('.md', '.mdx'))
+    ]
+
+
+def read_text(file_path: str) -> str:
+    """Read a UTF-8 file as text mode would, newlines included, in one read and
+    one decode. Pure ASCII files, the common case, use the cheaper ASCII codec."""
+    with open(file_path, "rb") as f:
+        data = f.read()
+    try:
+        text = data.decode("ascii")
+    except UnicodeDecodeError:
+        text = data.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def chunk_file(file_path: str) -> Tuple[Optional[List[Tuple[str, str, Dict]]], Optional[str]]:
+    """Read, parse and chunk one documentation file.
+
+    Runs in a worker process. Returns (chunks, None), where each chunk is a
+    (content, embedding text, metadata) tuple, or (None, error message).
+    """
+    try:
+        raw_content = read_text(file_path)
+
+        if not raw_content or raw_content.isspace():
+            return [], None
+
+        # Extract frontmatter
+        frontmatter, content = extract_frontmatter(raw_content)
+
+        # Parse headers
+        headers = parse_headers(content)
+
+        # Get file metadata
+        file_metadata = get_file_metadata(file_path, DOCS_DIR, frontmatter)
+
+        # Chunk content with sophisticated logic
+        chunks = chunk_content(content, headers, file_path, frontmatter)
+
+        results = []
+        for chunk in chunks:
+            if len(chunk['content'].strip()) < 50:
+                continue
+
+            # Create comprehensive metadata. Every value is already a str, int,
+            # float or bool (frontmatter is flattened when parsed), so it can go
+            # to ChromaDB without another pass over the dict.
+            metadata = file_metadata.copy()
+            metadata.update({
+                'chunk_title': chunk['title'],
+                'parent_context': chunk['parent_context'],
+                'section_type': chunk['section_type'],
+                'chunk_size': len(chunk['content']),
+                'context_headers': ", ".join(chunk['headers']) if chunk['headers'] else ""
+            })
+
+            results.append((chunk['content'], contextualize_chunk(chunk), metadata))
+        return results, None
+    except Exception as e:
+        return None, str(e)
 
 
 def ingest_docs():
@@ -309,13 +541,39 @@ def ingest_docs():
         }), file=sys.stderr)
         sys.exit(1)
 
+    # Find documentation files
+    doc_files = find_doc_files(DOCS_DIR)
+
+    if not doc_files:
+        print(json.dumps({
+            "type": "error",
+            "message": "No documentation files found"
+        }), file=sys.stderr)
+        sys.exit(1)
+
     # Initialize ChromaDB
     chromadb_path = get_chromadb_path()
     os.makedirs(chromadb_path, exist_ok=True)
 
+    manifest_path = Path(chromadb_path) / MANIFEST_NAME
+    model_name = embedding_model_name()
+    manifest = load_manifest(manifest_path)
+    if manifest is not None and (
+        manifest.get("model") != model_name or manifest.get("version") != MANIFEST_VERSION
+    ):
+        manifest = None
+
     try:
         chroma_client = chromadb.PersistentClient(path=chromadb_path)
         collection = chroma_client.get_or_create_collection("clarity_docs")
+        if manifest is None and collection.count() > 0:
+            # Existing chunks cannot be matched to their files; start over
+            print(json.dumps({
+                "type": "info",
+                "message": "No matching ingest manifest, rebuilding collection"
+            }), flush=True)
+            chroma_client.delete_collection("clarity_docs")
+            collection = chroma_client.get_or_create_collection("clarity_docs")
     except Exception as e:
         print(json.dumps({
             "type": "error",
@@ -323,118 +581,122 @@ def ingest_docs():
         }), file=sys.stderr)
         sys.exit(1)
 
-    # Load embedding model
-    print(json.dumps({"type": "info", "message": "Loading embedding model..."}), flush=True)
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-
-    # Find documentation files
-    doc_files = find_doc_files(DOCS_DIR)
-
-    if not doc_files:
-        print(json.dumps({
-            "type": "error",
-            "message": "No documentation files found"
-        }), file=sys.stderr)
-        sys.exit(1)
-
     # Report start
     print(json.dumps({"type": "start", "total": len(doc_files)}), flush=True)
 
-    docs, embeddings, metadatas, ids = [], [], [], []
-    chunk_id = 0
+    docs, texts, metadatas, ids, stale_ids = [], [], [], [], []
+    stored = 0
+    skipped = 0
+    previous_files = dict(manifest["files"]) if manifest else {}
+    ingested_files = {}
 
-    # Process each file
-    for i, file_path in enumerate(doc_files, 1):
+    # Hash every file first; only new or changed files are chunked
+    changed_files = []
+    for file_path in doc_files:
+        rel_path = os.path.relpath(file_path, DOCS_DIR)
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                raw_content = f.read()
+            with open(file_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError as e:
+            print(json.dumps({
+                "type": "warning",
+                "message": f"Error processing {file_path}: {str(e)}"
+            }), flush=True)
+            continue
 
-            if not raw_content.strip():
+        # Unchanged since the last run: its chunks are already stored
+        entry = previous_files.pop(rel_path, None)
+        if entry and entry.get("sha256") == digest:
+            ingested_files[rel_path] = entry
+            skipped += 1
+            continue
+        previous_ids = entry.get("ids", []) if entry else []
+        changed_files.append((file_path, rel_path, digest, previous_ids))
+
+    # Chunking is pure Python, so it is spread over worker processes while this
+    # process embeds. The pool is created before the writer thread starts so
+    # workers are not forked from a multi-threaded process.
+    with ProcessPoolExecutor(max_workers=min(CHUNK_WORKERS, max(len(changed_files), 1))) as executor:
+        results = executor.map(
+            chunk_file,
+            [file_path for file_path, _, _, _ in changed_files],
+            chunksize=8
+        )
+        submit, finish_writes = start_writer(collection)
+
+        for i, ((file_path, rel_path, digest, previous_ids), (file_chunks, error)) in enumerate(
+            zip(changed_files, results), skipped + 1
+        ):
+            if error is not None:
+                stale_ids.extend(previous_ids)
+                print(json.dumps({
+                    "type": "warning",
+                    "message": f"Error processing {file_path}: {error}"
+                }), flush=True)
                 continue
 
-            # Extract frontmatter
-            frontmatter, content = extract_frontmatter(raw_content)
-
-            # Parse headers
-            headers = parse_headers(content)
-
-            # Get file metadata
-            file_metadata = get_file_metadata(file_path, DOCS_DIR, frontmatter)
-
-            # Chunk content with sophisticated logic
-            chunks = chunk_content(content, headers, file_path, frontmatter)
-
-            # Process chunks
-            for chunk in chunks:
-                if len(chunk['content'].strip()) < 50:
-                    continue
-
-                # Create comprehensive metadata
-                metadata = file_metadata.copy()
-                metadata.update({
-                    'chunk_title': chunk['title'],
-                    'parent_context': chunk['parent_context'],
-                    'section_type': chunk['section_type'],
-                    'chunk_size': len(chunk['content']),
-                    'context_headers': ", ".join(chunk['headers']) if chunk['headers'] else ""
-                })
-
-                # Ensure valid types
-                for key, value in metadata.items():
-                    if isinstance(value, list):
-                        metadata[key] = ", ".join(str(v) for v in value)
-                    elif not isinstance(value, (str, int, float, bool)) or value is None:
-                        metadata[key] = str(value) if value is not None else ""
-
-                embedding = get_embedding(model, chunk['content'])
-
-                docs.append(chunk['content'])
-                embeddings.append(embedding)
+            unchanged_ids = set(previous_ids)
+            file_ids = []
+            for content, text, metadata in file_chunks:
+                chunk_id = get_chunk_id(rel_path, text, metadata)
+                if chunk_id in file_ids:
+                    continue  # Same chunk repeated within the file
+                file_ids.append(chunk_id)
+                if chunk_id in unchanged_ids:
+                    continue  # Stored by an earlier run exactly as it is now
+
+                docs.append(content)
+                texts.append(text)
                 metadatas.append(metadata)
-                ids.append(f"clarity_docs_{chunk_id}")
-                chunk_id += 1
+                ids.append(chunk_id)
+
+            # Only chunks that were edited or removed from the file are deleted
+            current_ids = set(file_ids)
+            stale_ids.extend(chunk_id for chunk_id in previous_ids if chunk_id not in current_ids)
+            ingested_files[rel_path] = {"sha256": digest, "ids": file_ids}
 
             # Report progress every 5 files
-            if i % 5 == 0 or i == 1:
+            if i % 5 == 0 or i == skipped + 1:
                 print(json.dumps({
                     "type": "progress",
                     "current": i,
                     "total": len(doc_files),
-                    "message": f"Processing {os.path.basename(file_path)} ({len(chunks)} chunks)"
+                    "message": f"Processing {os.path.basename(file_path)} ({len(file_chunks)} chunks)"
                 }), flush=True)
 
-        except Exception as e:
-            print(json.dumps({
-                "type": "warning",
-                "message": f"Error processing {file_path}: {str(e)}"
-            }), flush=True)
+            if len(docs) >= STORE_BATCH_SIZE:
+                store_batch(submit, docs, texts, metadatas, ids, stale_ids, unit="chunks")
+                stored += len(docs)
+                docs, texts, metadatas, ids, stale_ids = [], [], [], [], []
 
-    # Store in ChromaDB
-    if docs:
+    # Files that no longer exist
+    for entry in previous_files.values():
+        stale_ids.extend(entry.get("ids", []))
+
+    # Store the remaining batch
+    if docs or stale_ids:
+        store_batch(submit, docs, texts, metadatas, ids, stale_ids, unit="chunks")
+        stored += len(docs)
+    finish_writes()
+
+    try:
+        save_manifest(manifest_path, {
+            "version": MANIFEST_VERSION,
+            "model": model_name,
+            "files": ingested_files
+        })
+    except OSError as e:
         print(json.dumps({
-            "type": "info",
-            "message": f"Storing {len(docs)} chunks in ChromaDB..."
+            "type": "warning",
+            "message": f"Failed to write ingest manifest: {str(e)}"
         }), flush=True)
 
-        try:
-            collection.add(
-                documents=docs,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
-        except Exception as e:
-            print(json.dumps({
-                "type": "error",
-                "message": f"Failed to store in ChromaDB: {str(e)}"
-            }), file=sys.stderr)
-            sys.exit(1)
-
     # Report completion
     print(json.dumps({
         "type": "complete",
-        "total_processed": len(docs),
-        "files_processed": len(doc_files)
+        "total_processed": stored,
+        "files_processed": len(doc_files),
+        "files_skipped": skipped
     }), flush=True)
 
 
@@ -9,14 +9,26 @@ Outputs newline-delimited JSON progress messages to stdout.
 import os
 import sys
 import json
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Disable ChromaDB telemetry to avoid version compatibility issues
 os.environ["ANONYMIZED_TELEMETRY"] = "False"
 
 try:
-    from sentence_transformers import SentenceTransformer
     import chromadb
+    from embedding_model import embedding_model_name
+    from ingest_common import (
+        STORE_BATCH_SIZE,
+        get_chromadb_path,
+        iter_files,
+        load_manifest,
+        save_manifest,
+        start_writer,
+        store_batch,
+    )
 except ImportError as e:
     error_msg = {"type": "error", "message": f"Missing packages: {str(e)}"}
     print(json.dumps(error_msg), file=sys.stderr)
@@ -27,31 +39,27 @@ except ImportError as e:
 BACKEND_DIR = Path(__file__).parent.parent
 SAMPLES_DIR = BACKEND_DIR / "data" / "clarity_code_samples"
 MAX_FILES = 30000 # Maximum number of files to ingest to get best performance
+READ_WORKERS = 8  # Threads reading sample files ahead of the main loop
+READ_AHEAD = 64  # Files read ahead at most
+# Records the ingested files so unchanged ones are skipped on the next run
+MANIFEST_NAME = ".clarity_code_samples_manifest.json"
 
+# Bump when document ids or the embedded text change, so old collections are rebuilt
+MANIFEST_VERSION = 3
 
-def get_chromadb_path():
-    """Get ChromaDB path from environment or use backend default"""
-    chromadb_path = os.getenv("CHROMADB_PATH")
-    if chromadb_path:
-        return chromadb_path
-    # Default to backend data directory
-    return str(Path(__file__).parent.parent / "data" / "chromadb")
 
+def content_id(digest, has_toml):
+    """Document id suffix derived from a file's content hash. Files with identical
+    content share one stored document, so duplicates are embedded only once."""
+    return hashlib.sha256(f"{digest}:{has_toml}".encode("utf-8")).hexdigest()[:16]
 
-def get_embedding(model, text: str) -> list:
-    """Generate embedding for text"""
-    return model.encode(text).tolist()
 
-
-def get_metadata(file_path, base_dir, has_toml=False):
-    """Extract metadata from file path"""
-    rel_path = os.path.relpath(file_path, base_dir)
-    parts = rel_path.split(os.sep)
-    folders = parts[:-1]
-    filename = parts[-1]
+def get_metadata(rel_path, has_toml=False):
+    """Extract metadata from a path relative to the samples directory"""
+    folders, _, filename = rel_path.rpartition(os.sep)
 
     metadata = {
-        "folders": "/".join(folders),
+        "folders": folders.replace(os.sep, "/"),
         "filename": filename,
         "rel_path": rel_path,
         "file_type": "clarity" if filename.endswith(".clar") else "toml",
@@ -61,20 +69,58 @@ def get_metadata(file_path, base_dir, has_toml=False):
     return metadata
 
 
-def find_project_root_with_clarinet(file_dir: str, project_toml_map: dict, stop_dir: str) -> str:
-    """Ascend directories to find the nearest ancestor containing Clarinet.toml."""
+def find_project_root_with_clarinet(file_dir: str, project_toml_map: dict, stop_dir: str, cache: dict) -> str:
+    """Ascend directories to find the nearest ancestor containing Clarinet.toml.
+
+    file_dir and stop_dir must be absolute. The answer is memoized in cache for
+    every directory visited, so files sharing a directory cost one lookup.
+    """
+    visited = []
     current = file_dir
-    stop_dir = os.path.abspath(stop_dir)
     while True:
+        if current in cache:
+            root = cache[current]
+            break
+        visited.append(current)
         if current in project_toml_map:
-            return current
-        if os.path.abspath(current) == stop_dir:
-            return ""
+            root = current
+            break
+        if current == stop_dir:
+            root = ""
+            break
         parent = os.path.dirname(current)
         if parent == current:
-            return ""
+            root = ""
+            break
         current = parent
 
+    for directory in visited:
+        cache[directory] = root
+    return root
+
+
+def read_bytes(file_path):
+    """Read a whole file as bytes"""
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def read_files_ahead(file_paths):
+    """Yield a future with the bytes of each file, in order.
+
+    Reads run on a thread pool a bounded number of files ahead, so file I/O
+    latency (e.g. on a mounted volume) overlaps with processing. Errors are
+    raised by the future's result().
+    """
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        pending = deque()
+        for file_path in file_paths:
+            pending.append(executor.submit(read_bytes, file_path))
+            if len(pending) >= READ_AHEAD:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
 
 def find_project_files(samples_dir):
     """Find all .clar files and Clarinet.toml files in the samples directory."""
@@ -82,17 +128,15 @@ def find_project_files(samples_dir):
     clarinet_toml_files = []
     project_toml_map = {}  # Map project directories to their Clarinet.toml file
     
-    for root, _, files in os.walk(samples_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if file.endswith(".clar"):
-                clar_files.append(file_path)
-            elif file == "Clarinet.toml":
-                clarinet_toml_files.append(file_path)
-                # Store the project directory (parent of the Clarinet.toml file)
-                project_dir = os.path.dirname(file_path)
-                project_toml_map[project_dir] = file_path
-                
+    for entry in iter_files(str(samples_dir)):
+        if entry.name.endswith(".clar"):
+            clar_files.append(entry.path)
+        elif entry.name == "Clarinet.toml":
+            clarinet_toml_files.append(entry.path)
+            # Store the project directory (parent of the Clarinet.toml file)
+            project_dir = os.path.dirname(entry.path)
+            project_toml_map[project_dir] = entry.path
+
     return clar_files, clarinet_toml_files, project_toml_map
 
 
@@ -107,13 +151,46 @@ def ingest_samples():
         }), file=sys.stderr)
         sys.exit(1)
 
+    # Find files
+    # Absolute paths throughout, so ancestor lookups are plain string operations
+    samples_dir = os.path.abspath(SAMPLES_DIR)
+    clar_files, clarinet_toml_files, project_toml_map = find_project_files(samples_dir)
+    # Every path was found under samples_dir, so slicing off the prefix gives the
+    # same result as os.path.relpath without re-normalising both paths per file
+    rel_start = len(samples_dir.rstrip(os.sep)) + 1
+    project_root_cache = {}
+    total_files = len(clar_files) + len(clarinet_toml_files)
+
+    if total_files == 0:
+        print(json.dumps({
+            "type": "error",
+            "message": "No files found to ingest"
+        }), file=sys.stderr)
+        sys.exit(1)
+
     # Initialize ChromaDB
     chromadb_path = get_chromadb_path()
     os.makedirs(chromadb_path, exist_ok=True)
 
+    manifest_path = Path(chromadb_path) / MANIFEST_NAME
+    model_name = embedding_model_name()
+    manifest = load_manifest(manifest_path)
+    if manifest is not None and (
+        manifest.get("model") != model_name or manifest.get("version") != MANIFEST_VERSION
+    ):
+        manifest = None
+
     try:
         chroma_client = chromadb.PersistentClient(path=chromadb_path)
         collection = chroma_client.get_or_create_collection("clarity_code_samples")
+        if manifest is None and collection.count() > 0:
+            # Existing documents cannot be matched to their files; start over
+            print(json.dumps({
+                "type": "info",
+                "message": "No matching ingest manifest, rebuilding collection"
+            }), flush=True)
+            chroma_client.delete_collection("clarity_code_samples")
+            collection = chroma_client.get_or_create_collection("clarity_code_samples")
     except Exception as e:
         print(json.dumps({
             "type": "error",
@@ -121,32 +198,29 @@ def ingest_samples():
         }), file=sys.stderr)
         sys.exit(1)
 
-    # Load embedding model
-    print(json.dumps({"type": "info", "message": "Loading embedding model..."}), flush=True)
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-
-    # Find files
-    clar_files, clarinet_toml_files, project_toml_map = find_project_files(SAMPLES_DIR)
-    total_files = len(clar_files) + len(clarinet_toml_files)
-
-    if total_files == 0:
-        print(json.dumps({
-            "type": "error",
-            "message": "No files found to ingest"
-        }), file=sys.stderr)
-        sys.exit(1)
-
     # Report start
     print(json.dumps({"type": "start", "total": total_files}), flush=True)
 
-    docs, embeddings, metadatas, ids = [], [], [], []
+    docs, texts, metadatas, ids, stale_ids = [], [], [], [], []
+    stored = 0
+    skipped = 0
+    duplicates = 0
+    previous_files = dict(manifest["files"]) if manifest else {}
+    ingested_files = {}
+    # Ids already in the collection or queued for it. Outdated ids are only
+    # deleted at the end, once it is known no remaining file shares them.
+    known_ids = {doc_id for entry in previous_files.values() for doc_id in entry.get("ids", [])}
+    submit, finish_writes = start_writer(collection)
     current = 0
 
     # Process .clar files first
     print(json.dumps({"type": "info", "message": "Processing .clar files..."}), flush=True)
-    for file_path in clar_files:
+    for file_path, read in zip(clar_files, read_files_ahead(clar_files)):
         if remain_files <= 0:
-            print("Reached maximum file limit for ingestion.", flush=True)
+            print(json.dumps({
+                "type": "info",
+                "message": "Reached maximum file limit for ingestion."
+            }), flush=True)
             break
         remain_files -= 1
         current += 1
@@ -154,22 +228,43 @@ def ingest_samples():
         try:
             # Determine if this .clar file's project has a Clarinet.toml file (search ancestors)
             file_dir = os.path.dirname(file_path)
-            project_root = find_project_root_with_clarinet(file_dir, project_toml_map, str(SAMPLES_DIR))
+            project_root = find_project_root_with_clarinet(
+                file_dir, project_toml_map, samples_dir, project_root_cache
+            )
             has_toml = bool(project_root)
 
-            with open(file_path, "r", encoding="utf-8") as f:
-                code = f.read()
+            rel_path = file_path[rel_start:]
+            raw_bytes = read.result()
+            digest = hashlib.sha256(raw_bytes).hexdigest()
+
+            # Unchanged since the last run: it is already stored
+            entry = previous_files.pop(rel_path, None)
+            if entry and entry.get("sha256") == digest and entry.get("has_toml") == has_toml:
+                ingested_files[rel_path] = entry
+                skipped += 1
+                continue
+            if entry:
+                stale_ids.extend(entry.get("ids", []))
+
+            code = raw_bytes.decode("utf-8")
 
-            if not code.strip():
+            if not code or code.isspace():
                 continue
 
-            meta = get_metadata(file_path, SAMPLES_DIR, has_toml)
-            emb = get_embedding(model, code)
+            meta = get_metadata(rel_path, has_toml)
+
+            doc_id = f"clarity_sample_{content_id(digest, has_toml)}"
+            ingested_files[rel_path] = {"sha256": digest, "has_toml": has_toml, "ids": [doc_id]}
+            if doc_id in known_ids:
+                duplicates += 1
+                continue
+            known_ids.add(doc_id)
 
             docs.append(code)
-            embeddings.append(emb)
+            # Embed the path along with the code; it often names the contract's purpose
+            texts.append(f"File: {rel_path}\n{code}")
             metadatas.append(meta)
-            ids.append(f"clarity_sample_{current}")
+            ids.append(doc_id)
 
             # Report progress every 10 files
             if current % 10 == 0 or current == 1:
@@ -186,29 +281,55 @@ def ingest_samples():
                 "message": f"Error processing {file_path}: {str(e)}"
             }), flush=True)
 
+        if len(docs) >= STORE_BATCH_SIZE:
+            store_batch(submit, docs, texts, metadatas, ids, [])
+            stored += len(docs)
+            docs, texts, metadatas, ids = [], [], [], []
+
     # Process Clarinet.toml files
     print(json.dumps({"type": "info", "message": "Processing Clarinet.toml files..."}), flush=True)
-    for file_path in clarinet_toml_files:
+    for file_path, read in zip(clarinet_toml_files, read_files_ahead(clarinet_toml_files)):
         if remain_files <= 0:
-            print("Reached maximum file limit for ingestion.", flush=True)
+            print(json.dumps({
+                "type": "info",
+                "message": "Reached maximum file limit for ingestion."
+            }), flush=True)
             break
         remain_files -= 1
         current += 1
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                toml_content = f.read()
+            rel_path = file_path[rel_start:]
+            raw_bytes = read.result()
+            digest = hashlib.sha256(raw_bytes).hexdigest()
+
+            # Unchanged since the last run: it is already stored
+            entry = previous_files.pop(rel_path, None)
+            if entry and entry.get("sha256") == digest and entry.get("has_toml") == True:
+                ingested_files[rel_path] = entry
+                skipped += 1
+                continue
+            if entry:
+                stale_ids.extend(entry.get("ids", []))
+
+            toml_content = raw_bytes.decode("utf-8")
 
-            if not toml_content.strip():
+            if not toml_content or toml_content.isspace():
                 continue
 
-            meta = get_metadata(file_path, SAMPLES_DIR, has_toml=True)
-            emb = get_embedding(model, toml_content)
+            meta = get_metadata(rel_path, has_toml=True)
+
+            doc_id = f"toml_sample_{content_id(digest, True)}"
+            ingested_files[rel_path] = {"sha256": digest, "has_toml": True, "ids": [doc_id]}
+            if doc_id in known_ids:
+                duplicates += 1
+                continue
+            known_ids.add(doc_id)
 
             docs.append(toml_content)
-            embeddings.append(emb)
+            texts.append(f"File: {rel_path}\n{toml_content}")
             metadatas.append(meta)
-            ids.append(f"toml_sample_{current}")
+            ids.append(doc_id)
 
             if current % 10 == 0:
                 print(json.dumps({
@@ -224,31 +345,42 @@ def ingest_samples():
                 "message": f"Error processing {file_path}: {str(e)}"
             }), flush=True)
 
-    # Store in ChromaDB
-    if docs:
+        if len(docs) >= STORE_BATCH_SIZE:
+            store_batch(submit, docs, texts, metadatas, ids, [])
+            stored += len(docs)
+            docs, texts, metadatas, ids = [], [], [], []
+
+    # Files that no longer exist or are past the file limit
+    for entry in previous_files.values():
+        stale_ids.extend(entry.get("ids", []))
+    # Keep documents that another file still has the same content as
+    referenced_ids = {doc_id for entry in ingested_files.values() for doc_id in entry["ids"]}
+    stale_ids = sorted(set(stale_ids) - referenced_ids)
+
+    # Store the remaining batch
+    if docs or stale_ids:
+        store_batch(submit, docs, texts, metadatas, ids, stale_ids)
+        stored += len(docs)
+    finish_writes()
+
+    try:
+        save_manifest(manifest_path, {
+            "version": MANIFEST_VERSION,
+            "model": model_name,
+            "files": ingested_files
+        })
+    except OSError as e:
         print(json.dumps({
-            "type": "info",
-            "message": f"Storing {len(docs)} documents in ChromaDB..."
+            "type": "warning",
+            "message": f"Failed to write ingest manifest: {str(e)}"
         }), flush=True)
 
-        try:
-            collection.add(
-                documents=docs,
-                embeddings=embeddings,
-                metadatas=metadatas,
-                ids=ids
-            )
-        except Exception as e:
-            print(json.dumps({
-                "type": "error",
-                "message": f"Failed to store in ChromaDB: {str(e)}"
-            }), file=sys.stderr)
-            sys.exit(1)
-
     # Report completion
     print(json.dumps({
         "type": "complete",
-        "total_processed": len(docs)
+        "total_processed": stored,
+        "files_skipped": skipped,
+        "duplicates_skipped": duplicates
     }), flush=True)
 
 
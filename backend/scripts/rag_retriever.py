@@ -13,6 +13,13 @@ Input format:
   "docs_results": 8
 }
 
+With --serve the script stays running and answers one request per stdin line
+with one response per stdout line, keeping the model and client loaded.
+
+A batch of queries may be sent as "queries": ["...", "..."] instead of "query";
+they are embedded in one pass and the output is {"results": [<output>, ...]}
+in the same order.
+
 Output format:
 {
   "code_contexts": ["actor MyActor { ... }", "..."],
@@ -27,6 +34,9 @@ Output format:
 import sys
 import json
 import os
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -35,7 +45,9 @@ os.environ["ANONYMIZED_TELEMETRY"] = "False"
 
 try:
     import chromadb
-    from sentence_transformers import SentenceTransformer
+    import numpy as np
+    from embedding_cache import CACHE_NAME, EmbeddingCache, text_hash
+    from embedding_model import embedding_model_name, get_embedding_model
 except ImportError as e:
     error_msg = {
         "error": f"Missing required Python packages: {str(e)}. Please install chromadb and sentence-transformers."
@@ -43,8 +55,26 @@ except ImportError as e:
     print(json.dumps(error_msg), file=sys.stderr)
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_EMBEDDING_CACHE: Optional[EmbeddingCache] = None
+_CLIENT: Optional[Any] = None
+_QUERY_POOL: Optional[ThreadPoolExecutor] = None
+_CLIENT_DATA_VERSION: Optional[Tuple[Optional[float], ...]] = None
+# Most recently used query vectors, keyed by text_hash
+_QUERY_VECTORS: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
 
-_MODEL: Optional[SentenceTransformer] = None
+MAX_BATCH_QUERIES = 32
+
+# Query vectors kept in memory by a --serve worker
+QUERY_CACHE_SIZE = 1024
+
+# Written by the ingestion scripts when a run completes
+INGEST_MANIFESTS = (".clarity_code_samples_manifest.json", ".clarity_docs_manifest.json")
 
 
 def get_chromadb_path() -> str:
@@ -58,39 +88,124 @@ def get_chromadb_path() -> str:
     return str(default_path)
 
 
-def get_sentence_transformer() -> SentenceTransformer:
-    """Return a cached instance of the embedding model."""
-    global _MODEL
-    if _MODEL is None:
-        _MODEL = SentenceTransformer("all-MiniLM-L6-v2")
-    return _MODEL
+def data_version(chromadb_path: str) -> Tuple[Optional[float], ...]:
+    """Modification times of the ingest manifests; they change after every ingestion."""
+    version = []
+    for name in INGEST_MANIFESTS:
+        try:
+            version.append(os.stat(os.path.join(chromadb_path, name)).st_mtime)
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+def get_chroma_client(chromadb_path: str) -> Any:
+    """Return a ChromaDB client, reused across requests in --serve mode.
+
+    The client is reopened once an ingestion run has finished, since indexes
+    it already loaded would not show data written by another process.
+    """
+    global _CLIENT, _CLIENT_DATA_VERSION
+    version = data_version(chromadb_path)
+    if _CLIENT is None or version != _CLIENT_DATA_VERSION:
+        if _CLIENT is not None:
+            try:
+                from chromadb.api.client import SharedSystemClient
+
+                SharedSystemClient.clear_system_cache()
+            except Exception:
+                pass
+        _CLIENT = chromadb.PersistentClient(path=chromadb_path)
+        _CLIENT_DATA_VERSION = version
+    return _CLIENT
+
+
+def embed_queries(queries: List[str], chromadb_path: str) -> np.ndarray:
+    """Embed queries, reusing vectors for queries seen before.
+
+    The result is a float32 array that is handed to ChromaDB as is, without a
+    round trip through Python lists. Recent query vectors are kept in a bounded
+    in-process LRU; the persistent cache written by ingestion is only read, so
+    retrieval never grows it or competes with ingestion for its write lock.
+    Problems with the cache file never fail the request.
+    """
+    global _EMBEDDING_CACHE
+    model_name = embedding_model_name()
+    keys = [text_hash(model_name, query) for query in queries]
+
+    vectors = {}
+    for key in keys:
+        vector = _QUERY_VECTORS.get(key)
+        if vector is not None:
+            _QUERY_VECTORS.move_to_end(key)
+            vectors[key] = vector
+
+    missing = {}
+    for key, query in zip(keys, queries):
+        if key not in vectors:
+            missing[key] = query
+    if missing:
+        try:
+            if _EMBEDDING_CACHE is None:
+                _EMBEDDING_CACHE = EmbeddingCache(Path(chromadb_path) / CACHE_NAME, read_only=True)
+            vectors.update(_EMBEDDING_CACHE.get_many(list(missing)))
+        except (sqlite3.Error, ValueError, OSError):
+            pass
+
+        to_encode = [key for key in missing if key not in vectors]
+        if to_encode:
+            encoded = get_embedding_model().encode([missing[key] for key in to_encode])
+            vectors.update(zip(to_encode, np.asarray(encoded, dtype=np.float32)))
+
+        for key in missing:
+            _QUERY_VECTORS[key] = vectors[key]
+        while len(_QUERY_VECTORS) > QUERY_CACHE_SIZE:
+            _QUERY_VECTORS.popitem(last=False)
+
+    return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+
+
+def get_query_pool() -> ThreadPoolExecutor:
+    """Return the thread used to query the docs collection alongside the code one."""
+    global _QUERY_POOL
+    if _QUERY_POOL is None:
+        _QUERY_POOL = ThreadPoolExecutor(max_workers=1)
+    return _QUERY_POOL
+
+
+def dump_json(payload: Dict[str, object]) -> str:
+    """Serialise a response, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(payload)
 
 
 def query_collection(
     collection: Any,
-    query_embedding: List[float],
+    query_embeddings: np.ndarray,
     limit: int,
-) -> Tuple[List[str], List[Dict[str, object]], List[float]]:
-    """Query a ChromaDB collection and normalise the response."""
-    results = collection.query(query_embeddings=[query_embedding], n_results=limit)
+) -> List[Tuple[List[str], List[Dict[str, object]], List[float]]]:
+    """Query a ChromaDB collection for a batch of embeddings and normalise the response."""
+    results = collection.query(query_embeddings=query_embeddings, n_results=limit)
 
-    documents = results.get("documents", [[]])[0] if results else []
-    metadatas = results.get("metadatas", [[]])[0] if results else []
-    distances = results.get("distances", [[]])[0] if results else []
+    empty = [[] for _ in query_embeddings]
+    documents = (results.get("documents") if results else None) or empty
+    metadatas = (results.get("metadatas") if results else None) or empty
+    distances = (results.get("distances") if results else None) or empty
 
-    return documents, metadatas, distances
+    return list(zip(documents, metadatas, distances))
 
 
-def retrieve_context(query: str, n_results: int = 5, docs_results: Optional[int] = None):
+def retrieve_contexts(queries: List[str], n_results: int = 5, docs_results: Optional[int] = None):
     """
-    Retrieve relevant Clarity code context from ChromaDB
+    Retrieve relevant Clarity code context for a batch of queries
 
     Args:
-        query: The user's query string
-        n_results: Number of results to return
+        queries: The query strings
+        n_results: Number of results to return per query
 
     Returns:
-        Dictionary with contexts and metadata
+        Dictionary with one result per query, or an error
     """
     try:
         # Initialize ChromaDB client
@@ -101,7 +216,7 @@ def retrieve_context(query: str, n_results: int = 5, docs_results: Optional[int]
                 "error": f"ChromaDB path does not exist: {chromadb_path}. Please run ingestion first."
             }
 
-        client = chromadb.PersistentClient(path=chromadb_path)
+        client = get_chroma_client(chromadb_path)
 
         try:
             code_collection = client.get_collection(name="clarity_code_samples")
@@ -117,32 +232,43 @@ def retrieve_context(query: str, n_results: int = 5, docs_results: Optional[int]
         except Exception:
             docs_warning = "Collection 'clarity_docs' not found. Documentation results will be empty."
 
-        model = get_sentence_transformer()
-        query_embedding = model.encode(query).tolist()
-
-        code_docs, code_metas, code_distances = query_collection(code_collection, query_embedding, n_results)
+        query_embeddings = embed_queries(queries, chromadb_path)
 
         docs_limit = docs_results if isinstance(docs_results, int) and docs_results > 0 else n_results
-        doc_docs: List[str] = []
-        doc_metas: List[Dict[str, object]] = []
-        doc_distances: List[float] = []
+        doc_results = [([], [], []) for _ in queries]
 
+        # The two searches are independent and ChromaDB runs them outside the
+        # GIL, so the docs query overlaps with the code query
+        docs_future = None
         if docs_collection is not None:
-            doc_docs, doc_metas, doc_distances = query_collection(docs_collection, query_embedding, docs_limit)
-
-        response: Dict[str, object] = {
-            "code_contexts": code_docs,
-            "code_metadata": code_metas,
-            "code_distances": code_distances,
-            "docs_contexts": doc_docs,
-            "docs_metadata": doc_metas,
-            "docs_distances": doc_distances,
-        }
+            docs_future = get_query_pool().submit(
+                query_collection, docs_collection, query_embeddings, docs_limit
+            )
+
+        code_results = query_collection(code_collection, query_embeddings, n_results)
+
+        if docs_future is not None:
+            doc_results = docs_future.result()
+
+        results = []
+        for (code_docs, code_metas, code_distances), (doc_docs, doc_metas, doc_distances) in zip(
+            code_results, doc_results
+        ):
+            response: Dict[str, object] = {
+                "code_contexts": code_docs,
+                "code_metadata": code_metas,
+                "code_distances": code_distances,
+                "docs_contexts": doc_docs,
+                "docs_metadata": doc_metas,
+                "docs_distances": doc_distances,
+            }
 
-        if docs_warning:
-            response["warning"] = docs_warning
+            if docs_warning:
+                response["warning"] = docs_warning
 
-        return response
+            results.append(response)
+
+        return {"results": results}
 
     except Exception as e:
         return {
@@ -150,8 +276,85 @@ def retrieve_context(query: str, n_results: int = 5, docs_results: Optional[int]
         }
 
 
+def retrieve_context(query: str, n_results: int = 5, docs_results: Optional[int] = None):
+    """
+    Retrieve relevant Clarity code context from ChromaDB
+
+    Args:
+        query: The user's query string
+        n_results: Number of results to return
+
+    Returns:
+        Dictionary with contexts and metadata
+    """
+    batch = retrieve_contexts([query], n_results, docs_results)
+    if "error" in batch:
+        return batch
+    return batch["results"][0]
+
+
+def handle_request(request: Any) -> Dict[str, object]:
+    """Validate a parsed request and run the retrieval it asks for."""
+    # Validate required fields
+    if not isinstance(request, dict) or ("query" not in request and "queries" not in request):
+        return {"error": "Missing required field: query"}
+
+    queries = request.get("queries")
+    if queries is not None:
+        if (
+            not isinstance(queries, list)
+            or not queries
+            or len(queries) > MAX_BATCH_QUERIES
+            or not all(isinstance(q, str) and q for q in queries)
+        ):
+            return {
+                "error": f"queries must be a list of 1 to {MAX_BATCH_QUERIES} non-empty strings"
+            }
+
+    n_results = request.get("n_results", 5)
+    docs_results = request.get("docs_results")
+
+    # Validate n_results
+    if not isinstance(n_results, int) or n_results < 1 or n_results > 20:
+        return {"error": "n_results must be an integer between 1 and 20"}
+
+    if docs_results is not None:
+        if not isinstance(docs_results, int) or docs_results < 1 or docs_results > 20:
+            return {"error": "docs_results must be an integer between 1 and 20"}
+
+    # Retrieve context
+    if queries is not None:
+        return retrieve_contexts(queries, n_results, docs_results)
+    return retrieve_context(request["query"], n_results, docs_results)
+
+
+def serve():
+    """Answer newline-delimited JSON requests until stdin closes.
+
+    The embedding model and ChromaDB client stay loaded between requests, so
+    only the first request pays for loading them. Every request gets exactly
+    one response line, errors included.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            result = handle_request(json.loads(line))
+        except json.JSONDecodeError as e:
+            result = {"error": f"Invalid JSON input: {str(e)}"}
+        except Exception as e:
+            result = {"error": f"Unexpected error: {str(e)}"}
+
+        sys.stdout.write(dump_json(result) + "\n")
+        sys.stdout.flush()
+
+
 def main():
     """Main entry point - reads from stdin, writes to stdout"""
+    if "--serve" in sys.argv[1:]:
+        serve()
+        return
+
     try:
         # Read input from stdin
         input_data = sys.stdin.read()
@@ -169,33 +372,10 @@ def main():
             print(json.dumps(error_response))
             sys.exit(1)
 
-        # Validate required fields
-        if "query" not in request:
-            error_response = {"error": "Missing required field: query"}
-            print(json.dumps(error_response))
-            sys.exit(1)
-
-        query = request["query"]
-        n_results = request.get("n_results", 5)
-        docs_results = request.get("docs_results")
-
-        # Validate n_results
-        if not isinstance(n_results, int) or n_results < 1 or n_results > 20:
-            error_response = {"error": "n_results must be an integer between 1 and 20"}
-            print(json.dumps(error_response))
-            sys.exit(1)
-
-        if docs_results is not None:
-            if not isinstance(docs_results, int) or docs_results < 1 or docs_results > 20:
-                error_response = {"error": "docs_results must be an integer between 1 and 20"}
-                print(json.dumps(error_response))
-                sys.exit(1)
-
-        # Retrieve context
-        result = retrieve_context(query, n_results, docs_results)
+        result = handle_request(request)
 
         # Output result as JSON
-        print(json.dumps(result))
+        print(dump_json(result))
 
         # Exit with error code if there was an error
         if "error" in result:
@@ -66,6 +66,11 @@ export function registerGenerateClarityCode(
 	}
 
 	const backendBaseUrl = resolveBackendBaseUrl(options.baseUrl);
+	const endpointUrl = `${backendBaseUrl}${RAG_GENERATE_PATH}`;
+	const requestHeaders = {
+		'Content-Type': 'application/json',
+		'x-api-key': apiKey,
+	};
 
 	server.registerTool(
 		'generate_clarity_code',
@@ -88,17 +93,11 @@ export function registerGenerateClarityCode(
 			}
 
 			try {
-				const response = await fetch(
-					`${backendBaseUrl}${RAG_GENERATE_PATH}`,
-					{
-						method: 'POST',
-						headers: {
-							'Content-Type': 'application/json',
-							'x-api-key': apiKey,
-						},
-						body: JSON.stringify(payload),
-					},
-				);
+				const response = await fetch(endpointUrl, {
+					method: 'POST',
+					headers: requestHeaders,
+					body: JSON.stringify(payload),
+				});
 
 				const rawBody = await response.text();
 				const parsedBody: GenerateCodeResponse | undefined =
@@ -59,6 +59,11 @@ export function registerGetClarityContext(
 	}
 
 	const backendBaseUrl = resolveBackendBaseUrl(options.baseUrl);
+	const endpointUrl = `${backendBaseUrl}${RAG_RETRIEVE_PATH}`;
+	const requestHeaders = {
+		'Content-Type': 'application/json',
+		'x-api-key': apiKey,
+	};
 
 	server.registerTool(
 		'get_clarity_context',
@@ -80,17 +85,11 @@ export function registerGetClarityContext(
 			};
 
 			try {
-				const response = await fetch(
-					`${backendBaseUrl}${RAG_RETRIEVE_PATH}`,
-					{
-						method: 'POST',
-						headers: {
-							'Content-Type': 'application/json',
-							'x-api-key': apiKey,
-						},
-						body: JSON.stringify(payload),
-					},
-				);
+				const response = await fetch(endpointUrl, {
+					method: 'POST',
+					headers: requestHeaders,
+					body: JSON.stringify(payload),
+				});
 
 				const rawBody = await response.text();
 				const parsedBody: RetrieveContextResponse | undefined =